@@ -0,0 +1,108 @@
+"""Compare the native filesystem tools with the Node MCP filesystem server.
+
+Usage: python benchmarks/filesystem_tools.py [NUM_FILES]
+
+The MCP side is skipped if `npx` cannot start @modelcontextprotocol/server-filesystem.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from contextlib import AsyncExitStack
+
+ROUNDS = 20
+
+
+def make_tree(root: str, num_files: int) -> list:
+    paths = []
+    for i in range(num_files):
+        directory = os.path.join(root, f"pkg{i % 10}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"module{i}.py")
+        with open(path, "w") as f:
+            f.write(f"def function_{i}():\n    return {i}\n" * 200)
+        paths.append(os.path.relpath(path, root))
+    with open(os.path.join(root, "large.log"), "w") as f:
+        f.write("log line\n" * 500_000)
+    return paths
+
+
+def workload(paths: list) -> list:
+    return [
+        ("read_file", {"path": paths[0]}),
+        ("read_file (tail of 4 MiB)", {"path": "large.log", "tail": 10}),
+        ("read_multiple_files", {"paths": paths[:20]}),
+        ("list_directory", {"path": "pkg0"}),
+        ("directory_tree", {"path": "."}),
+        ("search_files", {"path": ".", "pattern": "module1"}),
+        ("get_file_info", {"path": paths[0]}),
+    ]
+
+
+async def time_calls(call, cases) -> dict:
+    results = {}
+    for name, args in cases:
+        await call(name.split(" ")[0], args)  # Warm up
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            await call(name.split(" ")[0], args)
+        results[name] = (time.perf_counter() - started) / ROUNDS * 1000
+    return results
+
+
+async def bench_native(cases) -> dict:
+    from murlix.core_agent import filesystem
+
+    async def call(name, args):
+        result = getattr(filesystem, name)(**args)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    return await time_calls(call, cases)
+
+
+async def bench_mcp(root: str, cases) -> dict:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(
+        command="npx", args=["-y", "@modelcontextprotocol/server-filesystem", root]
+    )
+    async with AsyncExitStack() as stack:
+        read, write = await stack.enter_async_context(stdio_client(params))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await asyncio.wait_for(session.initialize(), 60)
+
+        async def call(name, args):
+            args = {k: os.path.join(root, v) if k == "path" else v for k, v in args.items()}
+            if "paths" in args:
+                args["paths"] = [os.path.join(root, p) for p in args["paths"]]
+            return await session.call_tool(name, args)
+
+        return await time_calls(call, cases)
+
+
+async def main(num_files: int) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        paths = make_tree(root, num_files)
+        os.chdir(root)  # The tools are confined to the working directory
+        cases = workload(paths)
+
+        native = await bench_native(cases)
+        try:
+            mcp = await bench_mcp(root, cases)
+        except Exception as e:
+            print(f"MCP server unavailable, skipping it: {e!r}")
+            mcp = {}
+
+        print(f"{'tool':<28}{'native ms':>12}{'mcp ms':>12}")
+        for name, _ in cases:
+            mcp_ms = f"{mcp[name]:12.2f}" if name in mcp else f"{'-':>12}"
+            print(f"{name:<28}{native[name]:12.2f}{mcp_ms}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,70 @@
+"""Measure the time and memory to reach the first prompt, for full vs windowed resume.
+
+Only the resume load is measured. The first turn still loads the whole
+session, so this is not a bound on memory while chatting.
+
+Usage: python benchmarks/session_resume.py [NUM_EVENTS]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import tracemalloc
+
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService
+from google.genai.types import Content, Part
+
+from murlix.history import WindowedSessionService
+
+APP_NAME = "bench"
+USER_ID = "bench_user"
+
+
+async def populate(db_url: str, num_events: int) -> str:
+    service = DatabaseSessionService(db_url=db_url)
+    session = await service.create_session(app_name=APP_NAME, user_id=USER_ID)
+    text = "lorem ipsum dolor sit amet " * 40
+    for i in range(num_events):
+        author = "user" if i % 2 == 0 else "HelpfulAssistant"
+        event = Event(
+            invocation_id=f"inv-{i // 2}",
+            author=author,
+            content=Content(role="user" if author == "user" else "model", parts=[Part(text=text)]),
+        )
+        await service.append_event(session, event)
+    return session.id
+
+
+async def measure(service, session_id: str) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    # The windowed service only windows resume loads, which pass resume_config()
+    config = service.resume_config() if isinstance(service, WindowedSessionService) else None
+    session = await service.get_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session_id, config=config
+    )
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(session.events), elapsed, peak
+
+
+async def main(num_events: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        print(f"Populating session with {num_events} events...")
+        session_id = await populate(db_url, num_events)
+
+        for name, service in [
+            ("full", DatabaseSessionService(db_url=db_url)),
+            ("windowed", WindowedSessionService(db_url=db_url)),
+        ]:
+            events, elapsed, peak = await measure(service, session_id)
+            print(f"{name:>9}: {events:6d} events  {elapsed * 1000:8.1f} ms  peak {peak / 2**20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
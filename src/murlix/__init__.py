@@ -1,18 +1,22 @@
 """Murlix - A beautiful CLI chat interface."""
 
+import os
 import click
 import asyncio
 import sys
 from dotenv import load_dotenv
 
+# Load .env before importing modules that read configuration at import time
+load_dotenv()
+
 from .utils import supress_warnings
 from .utils.helper import clear_screen
 from .utils.console import console
 from .ui import display_welcome, show_ready_message
 from .session import SessionManager, resume_last_session, show_session_picker
 from .chat import run_chat_loop
-
-load_dotenv()
+from .profiler import profiler
+from .store import LEGACY_DB_FILENAME, migrate_database, project_key
 
 
 async def interactive_mode() -> None:
@@ -34,11 +38,21 @@ async def interactive_mode() -> None:
             await runner.close()
 
 
+def _stop_profiler() -> None:
+    """Stop the profiler started by --profile and report its output."""
+    for path in profiler.stop():
+        console.print(f"[dim]Profile written: {path}[/dim]")
+
+
 @click.group(invoke_without_command=True)
 @click.option('--query', '-q', default=None, help='Query to process')
+@click.option('--profile', is_flag=True, help='Profile Murlix itself and write per-turn samples')
 @click.pass_context
-def main(ctx, query) -> None:
+def main(ctx, query, profile) -> None:
     """Murlix CLI tool - A beautiful AI chat interface."""
+    if profile:
+        profiler.start()
+        ctx.call_on_close(_stop_profiler)
     if ctx.invoked_subcommand is None:
         if query:
             console.print(f"[cyan]Query:[/cyan] {query}")
@@ -74,5 +88,31 @@ def load_chat() -> None:
         console.print(f"[red]Error:[/red] {str(e)}")
 
 
+@main.command()
+@click.argument('db_paths', nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option('--project', default=None, type=click.Path(exists=True, file_okay=False),
+              help='Project the sessions belong to (defaults to the directory containing each database)')
+def migrate_sessions(db_paths, project) -> None:
+    """Copy per-directory session databases into the central store."""
+    if not db_paths:
+        if not os.path.exists(LEGACY_DB_FILENAME):
+            console.print(f"[yellow]No {LEGACY_DB_FILENAME} found in the current directory.[/yellow]")
+            return
+        db_paths = (LEGACY_DB_FILENAME,)
+
+    for db_path in db_paths:
+        db_path = os.path.abspath(db_path)
+        project_path = project or os.path.dirname(db_path)
+        try:
+            copied = migrate_database(f"sqlite:///{db_path}", project_path)
+        except Exception as e:
+            console.print(f"[red]Error migrating {db_path}:[/red] {str(e)}")
+            continue
+        console.print(
+            f"[green]Migrated[/green] {db_path} [dim]→ {project_key(project_path)}[/dim]: "
+            f"{copied.get('sessions', 0)} sessions, {copied.get('events', 0)} events"
+        )
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,15 +3,93 @@ from typing import Optional
 
 from google.genai.types import Content, Part
 from google.adk.runners import Runner
+from google.adk.events import Event
+from google.genai.errors import APIError
 
 from .utils.console import console
 from .session import SessionManager
 from .slash_commands import handle_slash_command
-from .ui import show_agent_response
+from .ui import show_agent_response, show_fanout_event, show_fanout_report, show_history_events
+from .profiler import profiler
+from .core_agent.agent import root_agent
+from .core_agent.fanout import run_fanout
+
+HISTORY_PAGE_SIZE = 20
+
+
+async def run_fanout_turn(prompt: str, session_manager: SessionManager, session_id: str) -> None:
+    """Run a fan-out and record the prompt and merged report in the chat session."""
+    profiler.begin_turn()
+    console.print("[dim]Planning subtasks...[/dim]")
+    try:
+        result = await run_fanout(prompt, session_manager.user_id, on_event=show_fanout_event)
+    except APIError as e:
+        console.print(f"[red]Model request failed ({e.code}):[/red] {e.message}")
+        return
+    except Exception as e:
+        # Keep chatting whatever went wrong in the planner or the workers
+        console.print(f"[red]Fan-out failed:[/red] {e}")
+        return
+    finally:
+        profiler.end_turn()
+    report = result.report()
+    show_fanout_report(report)
+
+    # Workers ran in their own session; keep only the outcome in this one
+    # so the next turn knows what was done
+    session = await session_manager.session_service.get_session(
+        app_name=session_manager.app_name,
+        user_id=session_manager.user_id,
+        session_id=session_id,
+        config=session_manager.session_service.resume_config(),
+    )
+    invocation_id = Event.new_id()
+    for author, role, text in (("user", "user", f"/fanout {prompt}"), (root_agent.name, "model", report)):
+        await session_manager.session_service.append_event(session, Event(
+            invocation_id=invocation_id,
+            author=author,
+            content=Content(role=role, parts=[Part(text=text)]),
+        ))
+
+
+async def show_history(
+    query: str, session_manager: SessionManager, session_id: str, before: Optional[Event]
+) -> Optional[Event]:
+    """Show a page of older messages, or search the whole session for `query`.
+
+    Returns the cursor for the next `/history` page, None once the start
+    of the session is reached.
+    """
+    service = session_manager.session_service
+    if query:
+        matches = await service.search_events(
+            app_name=session_manager.app_name,
+            user_id=session_manager.user_id,
+            session_id=session_id,
+            text=query,
+        )
+        show_history_events(list(reversed(matches)), f"Search: {query}")
+        return before
+
+    async for page in service.iter_event_pages(
+        app_name=session_manager.app_name,
+        user_id=session_manager.user_id,
+        session_id=session_id,
+        before=before,
+        page_size=HISTORY_PAGE_SIZE,
+    ):
+        show_history_events(page, "History")
+        if len(page) == HISTORY_PAGE_SIZE:
+            console.print("[dim]Use /history again to scroll further back.[/dim]")
+            return page[0]
+        break
+    console.print("[dim]Start of session reached.[/dim]")
+    return None
 
 
 async def run_chat_loop(runner: Runner, session_manager: SessionManager, session_id: str) -> None:
     """Run the main chat interaction loop."""
+    history_cursor: Optional[Event] = None
     try:
         while True:
             user_input = input("You: ")
@@ -22,20 +100,37 @@ async def run_chat_loop(runner: Runner, session_manager: SessionManager, session
                 
                 # Check if it's a quit command to break the loop
                 if command == '/quit':
-                    handle_slash_command(command)
+                    handle_slash_command(user_input)
                     break
+                elif command == '/fanout' and user_input[len(command):].strip():
+                    await run_fanout_turn(user_input[len(command):].strip(), session_manager, session_id)
+                    continue
+                elif command == '/history':
+                    history_cursor = await show_history(
+                        user_input[len(command):].strip(), session_manager, session_id, history_cursor
+                    )
+                    continue
                 else:
-                    handle_slash_command(command)
+                    handle_slash_command(user_input)
                     continue
 
+            history_cursor = None
             message = Content(role='user', parts=[Part(text=user_input)])
+            profiler.begin_turn()
             
-            async for event in runner.run_async(
-                            user_id=session_manager.user_id, 
-                            session_id=session_id, 
-                            new_message=message
-                        ):
-                show_agent_response(event)
+            try:
+                async for event in runner.run_async(
+                                user_id=session_manager.user_id, 
+                                session_id=session_id, 
+                                new_message=message
+                            ):
+                    show_agent_response(event)
+            except APIError as e:
+                # The scheduler already retried transient errors; report and keep chatting
+                console.print(f"[red]Model request failed ({e.code}):[/red] {e.message}")
+            finally:
+                # Time spent waiting for the next input is not part of this turn
+                profiler.end_turn()
 
     except KeyboardInterrupt:
         print("\nExiting...")
@@ -4,7 +4,14 @@ from google.adk.tools.mcp_tool import StdioConnectionParams
 from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
 from mcp import StdioServerParameters
 import subprocess
-_allowed_path = os.getcwd()
+
+from .model import ScheduledGemini
+from .paths import _allowed_path
+from .patch import apply_patch
+from .filesystem import filesystem_tools
+from .repo_map import repo_map
+from .tool_cache import tool_cache
+from ..profiler import profiler
 
 def run_command(command: str):
     """
@@ -36,19 +43,33 @@ def run_command(command: str):
         }
  
 
-mcp_toolsets = [
-    MCPToolset(
-        connection_params=StdioConnectionParams(
-            server_params=StdioServerParameters(
-                command="npx",
-                args=["-y",
-                     "@modelcontextprotocol/server-filesystem",
-                     _allowed_path,
-                ],
+def filesystem_toolset() -> list:
+    """
+    Filesystem tools confined to the allowed path.
+
+    Uses the in-process Python tools by default; set MURLIX_FS_BACKEND=mcp
+    to use the Node MCP filesystem server instead.
+    """
+    if os.environ.get("MURLIX_FS_BACKEND", "native") == "mcp":
+        return [
+            MCPToolset(
+                connection_params=StdioConnectionParams(
+                    server_params=StdioServerParameters(
+                        command="npx",
+                        args=["-y",
+                             "@modelcontextprotocol/server-filesystem",
+                             _allowed_path,
+                        ],
+                    ),
+                    timeout=5000000,
+                ),
             ),
-            timeout=5000000,
-        ),
-    ),
+        ]
+    return filesystem_tools
+
+
+mcp_toolsets = [
+    *filesystem_toolset(),
 
     MCPToolset(
                 connection_params=StdioConnectionParams(
@@ -63,15 +84,12 @@ mcp_toolsets = [
                ),
              ),
  
-    run_command     
+    run_command,
+    apply_patch,
  ]
 
 
-root_agent = LlmAgent(
-    model='gemini-2.0-flash',
-    name='HelpfulAssistant',
-    description="you are a helpful coding assistant.",
-    instruction=f"""
+INSTRUCTION = f"""
 You are an AI assistant specialized in software development with access to these tools:
 
 "file_system":
@@ -86,6 +104,11 @@ You are an AI assistant specialized in software development with access to these
 - Get version-specific implementation details
 - Verify API compatibility and usage
 
+"apply_patch":
+- Edit files with a unified diff or search/replace blocks
+- Change several files in one call; all edits apply or none do
+- Returns a short summary instead of file contents
+
 "run_command":
 - Execute terminal commands safely
 - Handle both string and list command formats
@@ -96,13 +119,24 @@ You are an AI assistant specialized in software development with access to these
 
 Guidelines:
 1. Always verify file paths exist before operations
-2. Create descriptive commit messages with prefix (feat:, fix:, docs:, etc.)
-3. Use Context7 to ensure up-to-date and correct implementations
-4. Provide explanations for significant code changes
-5. Follow project's existing code style and patterns
-6. Handle errors gracefully and provide meaningful feedback
+2. Use apply_patch to edit existing files; only use write_file for new files or full rewrites
+3. Create descriptive commit messages with prefix (feat:, fix:, docs:, etc.)
+4. Use Context7 to ensure up-to-date and correct implementations
+5. Provide explanations for significant code changes
+6. Follow project's existing code style and patterns
+7. Handle errors gracefully and provide meaningful feedback
 
 Maintain clean, efficient, and well-documented code while operating strictly within {_allowed_path}.
-    """,
+    """
+
+
+root_agent = LlmAgent(
+    model=ScheduledGemini(model='gemini-2.0-flash'),
+    name='HelpfulAssistant',
+    description="you are a helpful coding assistant.",
+    instruction=INSTRUCTION,
     tools=mcp_toolsets,
+    before_model_callback=repo_map.before_model,
+    before_tool_callback=[profiler.before_tool, tool_cache.before_tool],
+    after_tool_callback=[tool_cache.after_tool, repo_map.after_tool, profiler.after_tool],
 )
\ No newline at end of file
@@ -0,0 +1,341 @@
+import os
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError
+
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.agents.parallel_agent import ParallelAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService, Session
+from google.genai.types import Content, Part
+
+from .agent import INSTRUCTION, mcp_toolsets, root_agent
+from .model import ScheduledGemini
+from .patch import PatchError, touched_paths
+from .repo_map import repo_map
+from .tool_cache import WRITE_TOOLS, tool_cache
+from .paths import display_path, paths_in_args, resolve_path
+from ..profiler import profiler
+from ..scheduler import Priority, scheduler
+
+APP_NAME = "murlix-fanout"
+PLAN_KEY = "fanout_plan"
+
+
+class FanoutError(Exception):
+    """Raised when a fan-out cannot be planned."""
+
+
+class Subtask(BaseModel):
+    title: str = Field(description="Short name of the subtask")
+    instruction: str = Field(description="Self-contained description of what to do")
+    files: List[str] = Field(default_factory=list, description="Files the subtask will change")
+
+
+class Plan(BaseModel):
+    subtasks: List[Subtask]
+
+
+PLANNER_INSTRUCTION = """
+You split a software task into independent subtasks that separate workers
+will carry out in parallel, each without seeing the others' work.
+
+- Make one subtask per independent unit of work, e.g. one per file or module.
+- Each instruction must be self-contained: the worker only sees the overall
+  task, the plan and its own subtask.
+- List every file a subtask will change. Two subtasks must never change the
+  same file; if they would, make them one subtask.
+- If the task cannot be split, return a single subtask.
+"""
+
+WORKER_INSTRUCTION = """
+
+You are one of several workers carrying out parts of a larger task in parallel.
+
+Overall task:
+{prompt}
+
+Your subtask: {title}
+{instruction}
+
+Files assigned to you: {files}
+
+Only change the files assigned to you, or new files your subtask needs. Other
+workers own the rest; if a write is refused because another subtask owns the
+file, leave it alone and mention it in your summary. Do not ask questions.
+Finish with a short summary of what you changed.
+"""
+
+
+def merge_subtasks(subtasks: List[Subtask]) -> List[Subtask]:
+    """Merge subtasks that list a common file, so each file has one owner."""
+    def normalize(path: str) -> str:
+        try:
+            return resolve_path(path)
+        except ValueError:
+            return os.path.normpath(path)
+
+    groups: List[List[Subtask]] = []
+    owners: Dict[str, int] = {}
+    for subtask in subtasks:
+        paths = {normalize(f) for f in subtask.files}
+        shared = sorted({owners[p] for p in paths if p in owners})
+        if not shared:
+            index = len(groups)
+            groups.append([subtask])
+        else:
+            # Fold every group this subtask connects into the first one
+            index = shared[0]
+            for other in reversed(shared[1:]):
+                groups[index].extend(groups[other])
+                groups[other] = []
+            groups[index].append(subtask)
+            owners = {p: index if i in shared else i for p, i in owners.items()}
+        for path in paths:
+            owners[path] = index
+
+    merged = []
+    for group in groups:
+        if len(group) == 1:
+            merged.append(group[0])
+        elif group:
+            files: Dict[str, str] = {}
+            for subtask in group:
+                for f in subtask.files:
+                    files.setdefault(normalize(f), f)
+            merged.append(Subtask(
+                title=" + ".join(s.title for s in group),
+                instruction="\n\n".join(s.instruction for s in group),
+                files=list(files.values()),
+            ))
+    return merged
+
+
+@dataclass
+class Conflict:
+    worker: str
+    tool: str
+    path: str
+    owner: str
+
+
+@dataclass
+class FileClaims:
+    """Gives each written file a single owning worker for the whole fan-out.
+
+    Planned files are claimed up front; any other file is claimed by the
+    first worker that writes it. A write to a file owned by another worker
+    is refused with an error result. Only exact file paths are compared:
+    directories are shared, so `create_directory` never claims or
+    conflicts. `run_command` can't be checked.
+    """
+    owners: Dict[str, str] = field(default_factory=dict)
+    conflicts: List[Conflict] = field(default_factory=list)
+
+    def claim(self, worker: str, files: List[str]) -> None:
+        for path in files:
+            try:
+                full_path = resolve_path(path)
+            except ValueError:
+                continue
+            if not os.path.isdir(full_path):
+                self.owners.setdefault(full_path, worker)
+
+    def before_tool(self, tool, args, tool_context) -> Optional[dict]:
+        """before_tool_callback refusing writes to another worker's files."""
+        try:
+            if tool.name == "apply_patch":
+                paths = touched_paths(args.get("patch", ""))
+            elif tool.name in WRITE_TOOLS and tool.name != "create_directory":
+                paths = paths_in_args(args)
+            else:
+                return None
+        except (PatchError, ValueError):
+            # Let the tool report the invalid patch or path itself
+            return None
+
+        worker = tool_context.agent_name
+        for path in paths:
+            owner = self.owners.get(path, worker)
+            if owner != worker:
+                self.conflicts.append(Conflict(worker, tool.name, display_path(path), owner))
+                return {
+                    "status": "error",
+                    "error_message": f"{display_path(path)} is owned by another subtask ({owner}); leave it unchanged.",
+                }
+        for path in paths:
+            self.owners.setdefault(path, worker)
+        return None
+
+
+class Worker(LlmAgent):
+    """LlmAgent that holds a concurrency slot while it runs.
+
+    A failure is recorded in `failures` instead of raised, so one failing
+    subtask neither stops its siblings nor keeps its slot.
+    """
+    _slots: asyncio.Semaphore = PrivateAttr()
+    _failures: Dict[str, str] = PrivateAttr()
+
+    def __init__(self, *, slots: asyncio.Semaphore, failures: Dict[str, str], **kwargs):
+        super().__init__(**kwargs)
+        self._slots = slots
+        self._failures = failures
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        async with self._slots:
+            try:
+                async for event in super()._run_async_impl(ctx):
+                    yield event
+            except Exception as e:
+                self._failures[self.name] = f"{type(e).__name__}: {e}"
+
+
+def _format_plan(subtasks: List[Subtask]) -> str:
+    lines = [f"The task was split into {len(subtasks)} subtasks:"]
+    for i, subtask in enumerate(subtasks, 1):
+        files = f" (files: {', '.join(subtask.files)})" if subtask.files else ""
+        lines.append(f"{i}. {subtask.title}{files}")
+    return "\n".join(lines)
+
+
+def _instruction(text: str) -> Callable[[ReadonlyContext], str]:
+    # A callable instruction skips ADK's {state} templating, which would
+    # choke on braces in the user's prompt or the plan
+    return lambda context: text
+
+
+@dataclass
+class FanoutResult:
+    subtasks: List[Subtask]
+    summaries: List[str]
+    conflicts: List[Conflict]
+    concurrency: int
+    elapsed: float
+    failures: Dict[int, str] = field(default_factory=dict)
+
+    def report(self) -> str:
+        """Merged Markdown report of every worker's summary."""
+        if not self.subtasks:
+            return "The planner did not find any subtasks to run."
+        lines = [
+            f"**{len(self.subtasks)} subtasks** in {self.elapsed:.1f}s "
+            f"(up to {self.concurrency} at a time)"
+        ]
+        for i, (subtask, summary) in enumerate(zip(self.subtasks, self.summaries), 1):
+            lines.append(f"\n### {i}. {subtask.title}")
+            if subtask.files:
+                lines.append("Files: " + ", ".join(f"`{f}`" for f in subtask.files))
+            if i in self.failures:
+                lines.append(f"\n**Failed:** {self.failures[i]}")
+            if summary.strip() or i not in self.failures:
+                lines.append("\n" + (summary.strip() or "_No summary returned._"))
+        if self.conflicts:
+            lines.append("\n### Conflicts")
+            for c in self.conflicts:
+                lines.append(f"- {c.worker} was refused `{c.tool}` on `{c.path}` (owned by {c.owner})")
+        return "\n".join(lines)
+
+
+async def run_fanout(
+    prompt: str,
+    user_id: str,
+    concurrency: Optional[int] = None,
+    on_event: Optional[Callable] = None,
+) -> FanoutResult:
+    """Plan `prompt` into subtasks and run them as parallel sub-agents.
+
+    The planner and the workers each run in a throwaway in-memory session
+    so the workers' tool calls don't end up in the chat history; only the
+    report is meant to be kept. Each worker sees the overall task, the plan and
+    its own subtask, shares the main agent's tools, and is limited to
+    `concurrency` running at once (MURLIX_FANOUT_CONCURRENCY, default 4).
+    Model calls are scheduled at batch priority.
+    """
+    if concurrency is None:
+        concurrency = int(os.environ.get("MURLIX_FANOUT_CONCURRENCY", 4))
+    concurrency = max(1, concurrency)
+    started = time.perf_counter()
+    session_service = InMemorySessionService()
+
+    async def run(agent, text: str) -> Session:
+        """Run `agent` on `text` in a new session and return the session afterwards."""
+        # A fresh session per runner, so every event's author is in its agent tree
+        session = await session_service.create_session(app_name=APP_NAME, user_id=user_id)
+        # Not closed afterwards: the toolsets belong to the chat's runner
+        runner = Runner(agent=agent, app_name=APP_NAME, session_service=session_service)
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session.id,
+            new_message=Content(role="user", parts=[Part(text=text)]),
+        ):
+            if on_event:
+                on_event(event)
+        return await session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session.id)
+
+    planner = LlmAgent(
+        model=ScheduledGemini(model=root_agent.model.model),
+        name="planner",
+        description="Splits a task into independent subtasks.",
+        instruction=_instruction(PLANNER_INSTRUCTION),
+        output_schema=Plan,
+        output_key=PLAN_KEY,
+        before_model_callback=repo_map.before_model,
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+    )
+
+    with scheduler.priority(Priority.BATCH):
+        try:
+            session = await run(planner, prompt)
+            plan = Plan.model_validate(session.state.get(PLAN_KEY) or {"subtasks": []})
+        except ValidationError as e:
+            raise FanoutError(f"The planner returned an invalid plan: {e.errors()[0]['msg']}") from e
+        subtasks = merge_subtasks(plan.subtasks)
+        if not subtasks:
+            return FanoutResult([], [], [], concurrency, time.perf_counter() - started)
+
+        claims = FileClaims()
+        slots = asyncio.Semaphore(concurrency)
+        failures: Dict[str, str] = {}
+        workers = []
+        for i, subtask in enumerate(subtasks, 1):
+            name = f"worker_{i}"
+            claims.claim(name, subtask.files)
+            workers.append(Worker(
+                model=ScheduledGemini(model=root_agent.model.model),
+                name=name,
+                description=subtask.title,
+                instruction=_instruction(INSTRUCTION + WORKER_INSTRUCTION.format(
+                    prompt=prompt,
+                    title=subtask.title,
+                    instruction=subtask.instruction,
+                    files=", ".join(subtask.files) or "none",
+                )),
+                tools=mcp_toolsets,
+                output_key=f"fanout_{name}",
+                disallow_transfer_to_parent=True,
+                disallow_transfer_to_peers=True,
+                slots=slots,
+                failures=failures,
+                before_model_callback=repo_map.before_model,
+                before_tool_callback=[profiler.before_tool, claims.before_tool, tool_cache.before_tool],
+                after_tool_callback=[tool_cache.after_tool, repo_map.after_tool, profiler.after_tool],
+            ))
+
+        session = await run(
+            ParallelAgent(name="fanout", sub_agents=workers),
+            _format_plan(subtasks) + "\n\nCarry out your own subtask of this plan.",
+        )
+
+    summaries = [str(session.state.get(f"fanout_{w.name}", "")) for w in workers]
+    return FanoutResult(
+        subtasks, summaries, claims.conflicts, concurrency, time.perf_counter() - started,
+        failures={i: failures[w.name] for i, w in enumerate(workers, 1) if w.name in failures},
+    )
@@ -0,0 +1,281 @@
+import os
+import json
+import mmap
+import shutil
+import asyncio
+import fnmatch
+import inspect
+import functools
+from datetime import datetime
+from typing import List, Optional
+
+from .paths import _allowed_path, resolve_path
+
+# Files at least this large are read through mmap so head/tail reads only
+# touch the pages they need
+MMAP_THRESHOLD = 1024 * 1024
+
+
+def _tool(func):
+    """Make a tool async and turn filesystem errors into an error result.
+
+    ADK calls sync tools directly on the event loop, where a tree walk or a
+    large read would stall every other task, so sync tools run in a thread.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            if inspect.iscoroutinefunction(func):
+                return await func(*args, **kwargs)
+            return await asyncio.to_thread(func, *args, **kwargs)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            return {"status": "error", "error_message": str(e)}
+    return wrapper
+
+
+def _read_text(full_path: str, head: Optional[int] = None, tail: Optional[int] = None) -> str:
+    size = os.path.getsize(full_path)
+    if size < MMAP_THRESHOLD:
+        with open(full_path, "r", encoding="utf-8") as f:
+            if head:
+                return "".join(line for _, line in zip(range(head), f))
+            content = f.read()
+        if tail:
+            return "".join(content.splitlines(keepends=True)[-tail:])
+        return content
+
+    with open(full_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        if head:
+            end = -1
+            for _ in range(head):
+                end = m.find(b"\n", end + 1)
+                if end < 0:
+                    end = size - 1
+                    break
+            return m[:end + 1].decode("utf-8")
+        if tail:
+            start = size - 1 if m[size - 1:size] == b"\n" else size
+            for _ in range(tail):
+                start = m.rfind(b"\n", 0, start)
+                if start < 0:
+                    break
+            return m[start + 1:].decode("utf-8")
+        return m[:].decode("utf-8")
+
+
+@_tool
+def read_file(path: str, head: Optional[int] = None, tail: Optional[int] = None) -> str:
+    """
+    Reads the complete contents of a file as text.
+
+    Args:
+        path (str): Path of the file to read.
+        head (int): If set, only return the first N lines.
+        tail (int): If set, only return the last N lines.
+
+    Returns:
+        The file contents.
+    """
+    if head and tail:
+        raise ValueError("Cannot specify both head and tail")
+    return _read_text(resolve_path(path), head, tail)
+
+
+@_tool
+async def read_multiple_files(paths: List[str]) -> str:
+    """
+    Reads several files at once. A file that cannot be read does not stop the others.
+
+    Args:
+        paths (list[str]): Paths of the files to read.
+
+    Returns:
+        Each file's path followed by its contents, separated by "---".
+    """
+    async def read_one(path: str) -> str:
+        try:
+            content = await asyncio.to_thread(_read_text, resolve_path(path))
+            return f"{path}:\n{content}\n"
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            return f"{path}: Error - {e}"
+
+    results = await asyncio.gather(*(read_one(path) for path in paths))
+    return "\n---\n".join(results)
+
+
+@_tool
+def write_file(path: str, content: str) -> str:
+    """
+    Creates a new file or completely overwrites an existing file.
+
+    Args:
+        path (str): Path of the file to write.
+        content (str): The full new contents of the file.
+
+    Returns:
+        A confirmation message.
+    """
+    full_path = resolve_path(path)
+    with open(full_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return f"Successfully wrote to {path}"
+
+
+@_tool
+def create_directory(path: str) -> str:
+    """
+    Creates a directory, including any missing parents. Succeeds if it already exists.
+
+    Args:
+        path (str): Path of the directory to create.
+
+    Returns:
+        A confirmation message.
+    """
+    os.makedirs(resolve_path(path), exist_ok=True)
+    return f"Successfully created directory {path}"
+
+
+@_tool
+def list_directory(path: str) -> str:
+    """
+    Lists the files and directories directly inside a directory.
+
+    Args:
+        path (str): Path of the directory to list.
+
+    Returns:
+        One entry per line, prefixed with [FILE] or [DIR].
+    """
+    with os.scandir(resolve_path(path)) as entries:
+        return "\n".join(
+            f"{'[DIR]' if entry.is_dir() else '[FILE]'} {entry.name}"
+            for entry in sorted(entries, key=lambda e: e.name)
+        )
+
+
+def _tree(full_path: str) -> list:
+    tree = []
+    with os.scandir(full_path) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir(follow_symlinks=False):
+                tree.append({"name": entry.name, "type": "directory", "children": _tree(entry.path)})
+            else:
+                tree.append({"name": entry.name, "type": "file"})
+    return tree
+
+
+@_tool
+def directory_tree(path: str) -> str:
+    """
+    Gets a recursive tree of files and directories.
+
+    Args:
+        path (str): Path of the directory at the root of the tree.
+
+    Returns:
+        A JSON array of entries with "name", "type" and, for directories, "children".
+    """
+    return json.dumps(_tree(resolve_path(path)), indent=2)
+
+
+@_tool
+def move_file(source: str, destination: str) -> str:
+    """
+    Moves or renames a file or directory. Fails if the destination already exists.
+
+    Args:
+        source (str): Current path.
+        destination (str): New path.
+
+    Returns:
+        A confirmation message.
+    """
+    full_source = resolve_path(source)
+    full_destination = resolve_path(destination)
+    if os.path.exists(full_destination):
+        raise ValueError(f"Destination already exists: {destination}")
+    shutil.move(full_source, full_destination)
+    return f"Successfully moved {source} to {destination}"
+
+
+@_tool
+def search_files(path: str, pattern: str, excludePatterns: Optional[List[str]] = None) -> str:
+    """
+    Recursively searches for files and directories whose name matches a pattern.
+
+    Args:
+        path (str): Directory to search from.
+        pattern (str): Case-insensitive substring or glob pattern to match names against.
+        excludePatterns (list[str]): Glob patterns of paths to skip.
+
+    Returns:
+        Matching paths, one per line, or "No matches found".
+    """
+    root = resolve_path(path)
+    excludePatterns = excludePatterns or []
+    needle = pattern.lower()
+    is_glob = any(c in pattern for c in "*?[")
+    matches = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        relative_dir = os.path.relpath(dirpath, root)
+        dirnames[:] = [
+            d for d in dirnames
+            if not any(fnmatch.fnmatch(os.path.normpath(os.path.join(relative_dir, d)), p)
+                       or fnmatch.fnmatch(d, p) for p in excludePatterns)
+        ]
+        for name in dirnames + filenames:
+            relative = os.path.normpath(os.path.join(relative_dir, name))
+            if any(fnmatch.fnmatch(relative, p) or fnmatch.fnmatch(name, p) for p in excludePatterns):
+                continue
+            if fnmatch.fnmatch(name.lower(), needle) if is_glob else needle in name.lower():
+                matches.append(os.path.join(dirpath, name))
+    return "\n".join(matches) if matches else "No matches found"
+
+
+@_tool
+def get_file_info(path: str) -> str:
+    """
+    Retrieves metadata about a file or directory.
+
+    Args:
+        path (str): Path of the file or directory.
+
+    Returns:
+        Size, timestamps, type and permissions, one per line.
+    """
+    full_path = resolve_path(path)
+    stat = os.stat(full_path)
+    return "\n".join([
+        f"size: {stat.st_size}",
+        f"created: {datetime.fromtimestamp(stat.st_ctime)}",
+        f"modified: {datetime.fromtimestamp(stat.st_mtime)}",
+        f"accessed: {datetime.fromtimestamp(stat.st_atime)}",
+        f"isDirectory: {os.path.isdir(full_path)}",
+        f"isFile: {os.path.isfile(full_path)}",
+        f"permissions: {oct(stat.st_mode)[-3:]}",
+    ])
+
+
+def list_allowed_directories() -> str:
+    """
+    Returns the directories the filesystem tools are allowed to access.
+
+    Returns:
+        The allowed directories, one per line.
+    """
+    return f"Allowed directories:\n{_allowed_path}"
+
+
+filesystem_tools = [
+    read_file,
+    read_multiple_files,
+    write_file,
+    create_directory,
+    list_directory,
+    directory_tree,
+    move_file,
+    search_files,
+    get_file_info,
+    list_allowed_directories,
+]
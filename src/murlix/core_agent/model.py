@@ -0,0 +1,65 @@
+from typing import AsyncGenerator
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from ..scheduler import scheduler, estimate_tokens
+
+
+def _part_chars(part) -> int:
+    if part.text:
+        return len(part.text)
+    if part.function_call:
+        return len(part.function_call.name or "") + sum(len(str(v)) for v in (part.function_call.args or {}).values())
+    if part.function_response:
+        return len(part.function_response.name or "") + len(str(part.function_response.response or ""))
+    return 0
+
+
+def request_chars(llm_request: LlmRequest) -> int:
+    """Approximate size of a request: contents, system instruction and tool descriptions."""
+    chars = sum(
+        _part_chars(part)
+        for content in llm_request.contents
+        for part in (content.parts or [])
+    )
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if isinstance(instruction, str):
+        chars += len(instruction)
+    elif instruction is not None and getattr(instruction, "parts", None):
+        chars += sum(_part_chars(part) for part in instruction.parts)
+    chars += sum(len(name) + len(tool.description or "") for name, tool in llm_request.tools_dict.items())
+    return chars
+
+
+class ScheduledGemini(Gemini):
+    """Gemini model whose calls go through the shared model scheduler.
+
+    Every request waits for the request/token budget, and a call that fails
+    with a retryable error before producing any output is retried with backoff.
+    """
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        estimated = estimate_tokens(request_chars(llm_request))
+        attempt = 0
+        while True:
+            await scheduler.acquire(estimated)
+            yielded = False
+            usage = None
+            try:
+                async for response in super().generate_content_async(llm_request, stream):
+                    yielded = True
+                    if response.usage_metadata:
+                        usage = response.usage_metadata.total_token_count
+                    yield response
+                scheduler.record_usage(estimated, usage)
+                return
+            except Exception as e:
+                if yielded or not scheduler.should_retry(e, attempt):
+                    scheduler.stats.failed += 1
+                    raise
+                await scheduler.wait_before_retry(e, attempt)
+                attempt += 1
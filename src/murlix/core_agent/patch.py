@@ -0,0 +1,401 @@
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .paths import resolve_path, display_path
+
+
+class PatchError(Exception):
+    """Raised when a patch cannot be parsed or does not match the files."""
+
+
+@dataclass
+class Hunk:
+    """One unified diff hunk, as the lines it expects and the lines it writes."""
+    header: str
+    old_start: int
+    old_lines: List[str] = field(default_factory=list)
+    new_lines: List[str] = field(default_factory=list)
+    added: int = 0
+    removed: int = 0
+
+
+@dataclass
+class FilePatch:
+    """All changes to one file: diff hunks or search/replace pairs."""
+    path: str
+    new_path: Optional[str] = None
+    hunks: List[Hunk] = field(default_factory=list)
+    replacements: List[Tuple[str, str]] = field(default_factory=list)
+    is_new: bool = False
+    is_deleted: bool = False
+    # "\ No newline at end of file" markers, for the old and the new file
+    old_no_newline: bool = False
+    new_no_newline: bool = False
+
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,(\d+))? @@")
+_SEARCH = "<<<<<<< SEARCH"
+_DIVIDER = "======="
+_REPLACE = ">>>>>>> REPLACE"
+
+
+def apply_patch(patch: str) -> dict:
+    """
+    Applies a patch to one or more files atomically: either every change applies or none does.
+
+    Prefer this over rewriting whole files. Two formats are accepted:
+
+    1. A unified diff (as produced by `git diff` or `diff -u`), which may touch several
+       files, create files (--- /dev/null) or delete them (+++ /dev/null).
+    2. Search/replace blocks, each preceded by the file path on its own line:
+
+       path/to/file.py
+       <<<<<<< SEARCH
+       exact existing lines
+       =======
+       replacement lines
+       >>>>>>> REPLACE
+
+       The SEARCH text must match exactly one place in the file. An empty SEARCH
+       section creates a new file.
+
+    Args:
+        patch (str): The unified diff or search/replace blocks to apply.
+
+    Returns:
+        A dict with "status" and, on success, a short summary of each changed file.
+    """
+    try:
+        if _SEARCH in patch:
+            file_patches = _parse_search_replace(patch)
+        else:
+            file_patches = _parse_unified_diff(patch)
+        if not file_patches:
+            raise PatchError("Patch contains no changes")
+
+        changes = _prepare(file_patches)
+        _commit(changes)
+    except (PatchError, ValueError, OSError) as e:
+        return {"status": "error", "error_message": str(e)}
+
+    return {
+        "status": "success",
+        "files": [
+            {"path": display_path(path), "action": action, "added": added, "removed": removed}
+            for path, (_, action, added, removed) in changes.items()
+        ],
+    }
+
+
+def touched_paths(patch: str) -> List[str]:
+    """Paths a patch would write, resolved inside the allowed directory."""
+    if _SEARCH in patch:
+        file_patches = _parse_search_replace(patch)
+    else:
+        file_patches = _parse_unified_diff(patch)
+    paths = []
+    for file_patch in file_patches:
+        paths.append(resolve_path(file_patch.path))
+        if file_patch.new_path:
+            paths.append(resolve_path(file_patch.new_path))
+    return paths
+
+
+def _strip_prefix(path: str) -> str:
+    path = path.split("\t")[0].strip()
+    if path[:2] in ("a/", "b/") and not os.path.exists(resolve_path(path)):
+        return path[2:]
+    return path
+
+
+def _parse_unified_diff(patch: str) -> List[FilePatch]:
+    file_patches: List[FilePatch] = []
+    current: Optional[FilePatch] = None
+    hunk: Optional[Hunk] = None
+    # Lines still expected by the current hunk, from its header's counts
+    old_left = new_left = 0
+    lines = _split(patch)[0]
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        in_hunk = hunk is not None and (old_left > 0 or new_left > 0)
+        if in_hunk and (line == "" or line[0] in " -+"):
+            # A blank line inside a hunk is an empty context line
+            marker, text = line[:1] or " ", line[1:]
+            if marker != "+":
+                hunk.old_lines.append(text)
+                old_left -= 1
+            if marker != "-":
+                hunk.new_lines.append(text)
+                new_left -= 1
+            hunk.added += marker == "+"
+            hunk.removed += marker == "-"
+            i += 1
+            continue
+
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            old = line[4:].split("\t")[0].strip()
+            new = lines[i + 1][4:].split("\t")[0].strip()
+            is_new = old == "/dev/null"
+            is_deleted = new == "/dev/null"
+            old_path = None if is_new else _strip_prefix(old)
+            new_path = None if is_deleted else _strip_prefix(new)
+            current = FilePatch(
+                path=old_path or new_path,
+                new_path=new_path if old_path and new_path and new_path != old_path else None,
+                is_new=is_new,
+                is_deleted=is_deleted,
+            )
+            file_patches.append(current)
+            hunk = None
+            i += 2
+            continue
+
+        match = _HUNK_HEADER.match(line)
+        if match:
+            if current is None:
+                raise PatchError(f"Hunk without file header: {line}")
+            old_left = int(match.group(2) or 1)
+            new_left = int(match.group(3) or 1)
+            # With no old lines, the start is the line the hunk goes after
+            old_start = int(match.group(1)) + (old_left == 0)
+            hunk = Hunk(header=line, old_start=old_start)
+            current.hunks.append(hunk)
+        elif hunk is not None and line.startswith("\\"):
+            # "\ No newline at end of file" describes the side of the line
+            # before it: removed lines are old, added lines new, context both
+            marker = lines[i - 1][:1] or " "
+            if marker != "+":
+                current.old_no_newline = True
+            if marker != "-":
+                current.new_no_newline = True
+        elif hunk is not None and line[:1] in ("-", "+"):
+            raise PatchError(
+                f"Line after the end of hunk {hunk.header} in {current.path}; "
+                f"check the hunk's line counts:\n{line}"
+            )
+        i += 1
+    return file_patches
+
+
+def _parse_search_replace(patch: str) -> List[FilePatch]:
+    by_path: Dict[str, FilePatch] = {}
+    lines = _split(patch)[0]
+    path = None
+    i = 0
+    while i < len(lines):
+        if lines[i].strip() != _SEARCH:
+            i += 1
+            continue
+
+        # The path is the nearest non-blank line before the block; a block
+        # that directly follows another one continues the same file
+        for j in range(i - 1, -1, -1):
+            candidate = lines[j].strip()
+            if candidate == _REPLACE:
+                break
+            if candidate and not candidate.startswith("```"):
+                path = candidate
+                break
+        if not path:
+            raise PatchError("Search/replace block without a file path before it")
+
+        try:
+            divider = next(k for k in range(i + 1, len(lines)) if lines[k].strip() == _DIVIDER)
+            end = next(k for k in range(divider + 1, len(lines)) if lines[k].strip() == _REPLACE)
+        except StopIteration:
+            raise PatchError(f"Unterminated search/replace block for {path}")
+
+        search = "\n".join(lines[i + 1:divider])
+        replace = "\n".join(lines[divider + 1:end])
+        file_patch = by_path.setdefault(path, FilePatch(path=path))
+        file_patch.replacements.append((search, replace))
+        i = end + 1
+    return list(by_path.values())
+
+
+def _split(content: str) -> Tuple[List[str], str, bool]:
+    """Lines, line ending and whether the last line ends with one.
+
+    Only line feeds end lines, so form feeds and other characters that
+    str.splitlines() breaks on are written back unchanged.
+    """
+    newline = "\r\n" if "\r\n" in content else "\n"
+    trailing = content.endswith("\n")
+    lines = content.split("\n")
+    if trailing:
+        lines.pop()
+    if newline == "\r\n":
+        lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+    return lines, newline, trailing
+
+
+def _find(lines: List[str], block: List[str], start: int, expected: int) -> int:
+    """Index where `block` occurs at or after `start`, nearest to `expected`."""
+    if not block:
+        return max(start, min(expected, len(lines)))
+    for normalize in (lambda s: s, str.rstrip):
+        wanted = [normalize(line) for line in block]
+        positions = [
+            pos for pos in range(start, len(lines) - len(block) + 1)
+            if [normalize(line) for line in lines[pos:pos + len(block)]] == wanted
+        ]
+        if positions:
+            return min(positions, key=lambda pos: abs(pos - expected))
+    return -1
+
+
+def _apply_hunks(path: str, lines: List[str], hunks: List[Hunk]) -> Tuple[List[str], int, int]:
+    result = list(lines)
+    search_from = 0
+    offset = 0
+    added = removed = 0
+    for hunk in hunks:
+        expected = max(hunk.old_start - 1, 0) + offset
+        pos = _find(result, hunk.old_lines, search_from, expected)
+        if pos < 0:
+            preview = "\n".join(hunk.old_lines[:3])
+            raise PatchError(f"{display_path(path)}: context for hunk {hunk.header} not found:\n{preview}")
+        result[pos:pos + len(hunk.old_lines)] = hunk.new_lines
+        search_from = pos + len(hunk.new_lines)
+        offset += len(hunk.new_lines) - len(hunk.old_lines)
+        added += hunk.added
+        removed += hunk.removed
+    return result, added, removed
+
+
+def _apply_replacements(path: str, content: str, replacements: List[Tuple[str, str]]) -> Tuple[str, int, int]:
+    newline = "\r\n" if "\r\n" in content else "\n"
+    added = removed = 0
+    for search, replace in replacements:
+        search, replace = search.replace("\n", newline), replace.replace("\n", newline)
+        count = content.count(search)
+        if count == 0:
+            raise PatchError(f"{display_path(path)}: SEARCH text not found:\n{search[:200]}")
+        if count > 1:
+            raise PatchError(f"{display_path(path)}: SEARCH text matches {count} places; add more context")
+        content = content.replace(search, replace, 1)
+        removed += len(search.splitlines())
+        added += len(replace.splitlines())
+    return content, added, removed
+
+
+def _prepare(file_patches: List[FilePatch]) -> Dict[str, Tuple[Optional[str], str, int, int]]:
+    """Compute new contents for every file before touching the disk.
+
+    Several sections for the same file apply one after another, each to
+    the result of the previous one.
+    """
+    changes: Dict[str, Tuple[Optional[str], str, int, int]] = {}
+
+    def current(path: str) -> Optional[str]:
+        """Content of `path` after the sections prepared so far, or None if absent."""
+        if path in changes:
+            return changes[path][0]
+        if not os.path.isfile(path):
+            return None
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def record(path: str, content: Optional[str], action: str, added: int, removed: int) -> None:
+        if path in changes:
+            previous_content, previous_action, previous_added, previous_removed = changes[path]
+            if previous_action == "created" and content is not None:
+                action = "created"
+            elif previous_action in ("deleted", "moved") and content is not None:
+                action = "modified"
+            added += previous_added
+            removed += previous_removed
+        changes[path] = (content, action, added, removed)
+
+    for file_patch in file_patches:
+        path = resolve_path(file_patch.path)
+        original = current(path)
+
+        if file_patch.replacements:
+            if original is None:
+                if len(file_patch.replacements) != 1 or file_patch.replacements[0][0]:
+                    raise PatchError(f"File not found: {file_patch.path}")
+                content = file_patch.replacements[0][1] + "\n"
+                record(path, content, "created", len(content.splitlines()), 0)
+                continue
+            content, added, removed = _apply_replacements(path, original, file_patch.replacements)
+            record(path, content, "modified", added, removed)
+            continue
+
+        if file_patch.is_new:
+            if original is not None:
+                raise PatchError(f"File already exists: {file_patch.path}")
+            lines, newline, trailing = [], "\n", not file_patch.new_no_newline
+        else:
+            if original is None:
+                raise PatchError(f"File not found: {file_patch.path}")
+            lines, newline, trailing = _split(original)
+            if file_patch.new_no_newline:
+                trailing = False
+            elif file_patch.old_no_newline:
+                # The diff reaches the end of the file and adds the missing newline
+                trailing = True
+
+        new_lines, added, removed = _apply_hunks(path, lines, file_patch.hunks)
+        if file_patch.is_deleted:
+            record(path, None, "deleted", 0, len(lines))
+            continue
+
+        content = newline.join(new_lines) + (newline if trailing and new_lines else "")
+        if file_patch.new_path:
+            record(path, None, "moved", 0, 0)
+            path = resolve_path(file_patch.new_path)
+            if current(path) is not None:
+                raise PatchError(f"File already exists: {file_patch.new_path}")
+        record(path, content, "created" if file_patch.is_new else "modified", added, removed)
+    return changes
+
+
+def _write_atomic(path: str, content: str) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".murlix-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _commit(changes: Dict[str, Tuple[Optional[str], str, int, int]]) -> None:
+    """Write every change, restoring the originals if any write fails."""
+    originals: Dict[str, Optional[bytes]] = {}
+    for path in changes:
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                originals[path] = f.read()
+        else:
+            originals[path] = None
+
+    done: List[str] = []
+    try:
+        for path, (content, _, _, _) in changes.items():
+            if content is None:
+                os.remove(path)
+            else:
+                _write_atomic(path, content)
+            done.append(path)
+    except OSError:
+        for path in done:
+            original = originals[path]
+            if original is None:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                with open(path, "wb") as f:
+                    f.write(original)
+        raise
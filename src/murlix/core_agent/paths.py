@@ -0,0 +1,38 @@
+import os
+from typing import Any, Dict, List
+
+_allowed_path = os.getcwd()
+
+# Tool arguments that name files or directories
+PATH_ARGS = ("path", "paths", "source", "destination")
+
+
+def resolve_path(path: str) -> str:
+    """Resolve a path against the allowed directory, refusing anything outside it."""
+    root = os.path.realpath(_allowed_path)
+    full_path = os.path.realpath(os.path.join(root, os.path.expanduser(path)))
+    if os.path.commonpath([full_path, root]) != root:
+        raise ValueError(f"Access denied - path outside allowed directory: {path}")
+    return full_path
+
+
+def display_path(full_path: str) -> str:
+    """Path relative to the allowed directory, for compact tool results."""
+    return os.path.relpath(full_path, os.path.realpath(_allowed_path))
+
+
+def paths_in_args(args: Dict[str, Any]) -> List[str]:
+    """Resolved paths named in a tool's arguments. Raises ValueError if any is outside the root."""
+    paths = []
+    for name in PATH_ARGS:
+        value = args.get(name)
+        if isinstance(value, str):
+            paths.append(resolve_path(value))
+        elif isinstance(value, list):
+            paths.extend(resolve_path(v) for v in value if isinstance(v, str))
+    return paths
+
+
+def overlaps(a: str, b: str) -> bool:
+    """Whether one path is the other or contains it."""
+    return a == b or a.startswith(b.rstrip(os.sep) + os.sep) or b.startswith(a.rstrip(os.sep) + os.sep)
@@ -0,0 +1,306 @@
+import os
+import re
+import asyncio
+import ast
+import json
+import hashlib
+import subprocess
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+from .paths import _allowed_path
+from .tool_cache import is_error, written_paths
+
+MAX_FILES = 5000
+MAX_SYMBOL_FILE_SIZE = 512 * 1024
+MAX_SYMBOLS_PER_FILE = 12
+CACHE_VERSION = 1
+
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache", "dist",
+    "build", "target", ".idea", ".vscode", ".murlix",
+}
+
+LANGUAGES = {
+    ".py": "Python", ".js": "JavaScript", ".jsx": "JavaScript", ".mjs": "JavaScript",
+    ".ts": "TypeScript", ".tsx": "TypeScript", ".go": "Go", ".rs": "Rust",
+    ".java": "Java", ".kt": "Kotlin", ".rb": "Ruby", ".php": "PHP", ".c": "C",
+    ".h": "C", ".cc": "C++", ".cpp": "C++", ".hpp": "C++", ".cs": "C#",
+    ".swift": "Swift", ".scala": "Scala", ".sh": "Shell", ".md": "Markdown",
+    ".json": "JSON", ".yml": "YAML", ".yaml": "YAML", ".toml": "TOML",
+    ".html": "HTML", ".css": "CSS", ".sql": "SQL",
+}
+
+# Top-level definitions for languages without a parser in the standard library
+SYMBOL_PATTERNS = {
+    "JavaScript": re.compile(r"^(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:function\*?|class|const|let)\s+([A-Za-z_$][\w$]*)", re.M),
+    "TypeScript": re.compile(r"^(?:export\s+)?(?:default\s+)?(?:abstract\s+)?(?:async\s+)?(?:function\*?|class|interface|type|enum|const)\s+([A-Za-z_$][\w$]*)", re.M),
+    "Go": re.compile(r"^(?:func(?:\s+\([^)]*\))?|type)\s+([A-Za-z_]\w*)", re.M),
+    "Rust": re.compile(r"^(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:fn|struct|enum|trait|mod)\s+([A-Za-z_]\w*)", re.M),
+    "Java": re.compile(r"^(?:public\s+|abstract\s+|final\s+)*(?:class|interface|enum|record)\s+([A-Za-z_]\w*)", re.M),
+    "Kotlin": re.compile(r"^(?:\w+\s+)*(?:class|interface|object|fun)\s+([A-Za-z_]\w*)", re.M),
+    "Ruby": re.compile(r"^(?:class|module|def)\s+([A-Za-z_][\w.:]*)", re.M),
+    "PHP": re.compile(r"^(?:abstract\s+|final\s+)?(?:class|interface|trait|function)\s+([A-Za-z_]\w*)", re.M),
+    "C#": re.compile(r"^\s*(?:public\s+|internal\s+)?(?:static\s+|abstract\s+|sealed\s+|partial\s+)*(?:class|interface|struct|enum|record)\s+([A-Za-z_]\w*)", re.M),
+    "Swift": re.compile(r"^(?:public\s+|open\s+|final\s+)*(?:class|struct|enum|protocol|func)\s+([A-Za-z_]\w*)", re.M),
+}
+
+
+def _cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "murlix", "repo-maps")
+
+
+def _python_symbols(source: str) -> List[str]:
+    symbols = []
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.ClassDef):
+            symbols.append(f"class {node.name}")
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            symbols.append(f"{node.name}()")
+    return symbols
+
+
+def extract_symbols(path: str, language: Optional[str]) -> List[str]:
+    """Top-level symbols defined in a file, or [] if it cannot be parsed."""
+    if language != "Python" and language not in SYMBOL_PATTERNS:
+        return []
+    try:
+        if os.path.getsize(path) > MAX_SYMBOL_FILE_SIZE:
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        if language == "Python":
+            symbols = _python_symbols(source)
+        else:
+            symbols = [match.strip() for match in SYMBOL_PATTERNS[language].findall(source)]
+    except (OSError, UnicodeDecodeError, SyntaxError, ValueError):
+        return []
+    return list(dict.fromkeys(symbols))[:MAX_SYMBOLS_PER_FILE]
+
+
+def _parse(full_path: str, relative: str, stat: os.stat_result) -> dict:
+    language = LANGUAGES.get(os.path.splitext(relative)[1].lower())
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "language": language,
+        "symbols": extract_symbols(full_path, language),
+    }
+
+
+class RepoMap:
+    """Compact map of the allowed directory: files, languages and top-level symbols.
+
+    Per-file results are cached on disk and keyed by mtime and size, so a
+    refresh only re-parses files that changed since the last session. `start`
+    builds the map in a background thread and `before_model` adds it to each
+    model request once it is ready. During a session, `after_tool` marks paths
+    written by the agent's tools, and the next `before_model` updates just
+    those entries off the event loop; after `run_command`, whose effects are
+    unknown, every file is checked again.
+    """
+
+    def __init__(self, root: str = _allowed_path, cache_dir: Optional[str] = None):
+        self.root = os.path.realpath(root)
+        digest = hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:16]
+        self.cache_path = os.path.join(cache_dir or _cache_dir(), f"{digest}.json")
+        self.files: Dict[str, dict] = {}
+        self.truncated = False
+        self._rendered: Dict[int, str] = {}
+        self._dirty: Set[str] = set()
+        self._stale = False
+        self._build: Optional[asyncio.Future] = None
+        self._lock = asyncio.Lock()
+
+    def _list_files(self) -> List[str]:
+        """Relative file paths, honoring .gitignore inside git repositories."""
+        try:
+            result = subprocess.run(
+                ["git", "ls-files", "--cached", "--others", "--exclude-standard", "-z"],
+                cwd=self.root, capture_output=True, timeout=30,
+            )
+            if result.returncode == 0:
+                paths = [p for p in result.stdout.decode("utf-8", "replace").split("\0") if p]
+                return [p for p in paths if not SKIP_DIRS.intersection(p.split("/")[:-1])]
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+            for name in sorted(filenames):
+                paths.append(os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/"))
+                if len(paths) > MAX_FILES:
+                    return paths
+        return paths
+
+    def _load_cache(self) -> Dict[str, dict]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION and cache.get("root") == self.root:
+                return cache["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def _save_cache(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "root": self.root, "files": self.files}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def refresh(self) -> None:
+        """Rebuild the map, re-parsing only files whose mtime or size changed."""
+        # Entries already in memory are as good as the disk cache, and cheaper
+        cached = self.files or self._load_cache()
+        paths = sorted(self._list_files())
+        files = {}
+        changed = False
+        for relative in paths[:MAX_FILES]:
+            full_path = os.path.join(self.root, relative)
+            try:
+                stat = os.stat(full_path)
+            except OSError:
+                continue
+            entry = cached.get(relative)
+            if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                entry = _parse(full_path, relative, stat)
+                changed = True
+            files[relative] = entry
+        self.truncated = len(paths) > MAX_FILES
+        self.files = files
+        self._rendered = {}
+        if changed or files.keys() != cached.keys():
+            self._save_cache()
+
+    def mark_dirty(self, paths: Optional[List[str]]) -> None:
+        """Note absolute paths that changed, or None if anything may have changed."""
+        if paths is None:
+            self._stale = True
+            return
+        for path in paths:
+            relative = os.path.relpath(path, self.root)
+            if relative.startswith(os.pardir) or relative == os.curdir:
+                continue
+            self._dirty.add(relative.replace(os.sep, "/"))
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> None:
+        """after_tool_callback marking the paths a write tool changed."""
+        if is_error(tool_response):
+            return None
+        written = written_paths(tool.name, args)
+        if written is None or written:
+            self.mark_dirty(written)
+        return None
+
+    def start(self) -> None:
+        """Build the map in a background thread without waiting for it."""
+        self._build = asyncio.ensure_future(asyncio.to_thread(self.refresh))
+
+    async def before_model(self, callback_context, llm_request) -> None:
+        """before_model_callback adding the up-to-date map to the instruction.
+
+        Pending changes are applied in a thread, so neither a rescan nor
+        re-parsing blocks the event loop. Until the build from `start` is
+        done, requests go out without a map.
+        """
+        if self._build is not None and not self._build.done():
+            return None
+        async with self._lock:
+            dirty, stale = self._dirty, self._stale
+            self._dirty, self._stale = set(), False
+            if dirty or stale:
+                await asyncio.to_thread(self._update, dirty, stale)
+        section = self.prompt()
+        if section:
+            llm_request.append_instructions([section])
+        return None
+
+    def _update(self, dirty: Set[str], stale: bool) -> None:
+        """Bring the entries of changed paths up to date, or all of them if `stale`."""
+        if stale or any(os.path.isdir(os.path.join(self.root, p)) for p in dirty):
+            # A moved directory takes its files along; list everything again
+            self.refresh()
+            return
+        # Prompts are rendered on the event loop; swap in a new dict when done
+        files = dict(self.files)
+        changed = False
+        for relative in dirty:
+            if SKIP_DIRS.intersection(relative.split("/")[:-1]):
+                continue
+            full_path = os.path.join(self.root, relative)
+            try:
+                stat = os.stat(full_path)
+            except OSError:
+                changed |= files.pop(relative, None) is not None
+                continue
+            entry = files.get(relative)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            if entry is None and len(files) >= MAX_FILES:
+                self.truncated = True
+                continue
+            files[relative] = _parse(full_path, relative, stat)
+            changed = True
+        if changed:
+            self.files = files
+            self._rendered = {}
+            self._save_cache()
+
+    def render(self, max_tokens: int) -> str:
+        """Render the map within roughly `max_tokens` tokens (4 characters each)."""
+        if not self.files:
+            return ""
+        languages = Counter(e["language"] for e in self.files.values() if e["language"])
+        header = (
+            f"Repository map of {self.root} ({len(self.files)}{'+' if self.truncated else ''} files"
+            + (f"; {', '.join(f'{name} {count}' for name, count in languages.most_common(6))}" if languages else "")
+            + "):"
+        )
+        budget = max_tokens * 4 - len(header)
+
+        # Shallow files first so the overall layout survives a small budget
+        by_depth = sorted(self.files, key=lambda p: (p.count("/"), p))
+        lines: Dict[str, str] = {}
+        for relative in by_depth:
+            symbols = self.files[relative]["symbols"]
+            line = f"{relative}: {', '.join(symbols)}" if symbols else relative
+            if len(line) + 1 > budget:
+                line = relative
+                if len(line) + 1 > budget:
+                    break
+            lines[relative] = line
+            budget -= len(line) + 1
+
+        body = [lines[p] for p in sorted(lines)]
+        omitted = len(self.files) - len(lines)
+        if omitted:
+            body.append(f"... {omitted} more files not shown")
+        return "\n".join([header, *body])
+
+    def prompt(self) -> str:
+        """Instruction section with the token-budgeted map, or "" if disabled."""
+        max_tokens = int(os.environ.get("MURLIX_REPO_MAP_TOKENS", 1024))
+        if max_tokens <= 0:
+            return ""
+        # Every model call includes the map; render only after changes
+        if max_tokens not in self._rendered:
+            self._rendered[max_tokens] = self.render(max_tokens)
+        rendered = self._rendered[max_tokens]
+        if not rendered:
+            return ""
+        return (
+            "The repository layout is summarized below. Use it instead of listing "
+            "directories to orient yourself; it may be slightly out of date.\n\n"
+            + rendered
+        )
+
+
+repo_map = RepoMap()
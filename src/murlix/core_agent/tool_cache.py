@@ -0,0 +1,231 @@
+import os
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .paths import PATH_ARGS, overlaps, paths_in_args, resolve_path
+from .patch import PatchError, touched_paths
+
+# Tools that only read, whose results can be reused while their inputs are unchanged
+READ_ONLY_TOOLS = {
+    "read_file", "read_text_file", "read_multiple_files", "list_directory",
+    "list_directory_with_sizes", "directory_tree", "search_files",
+    "get_file_info", "list_allowed_directories",
+}
+# Results that depend on a whole subtree, which a stat of the root can't validate
+RECURSIVE_TOOLS = {"directory_tree", "search_files"}
+# Results on a directory that depend on its entries' sizes, which an in-place
+# edit changes without touching the directory's own mtime
+CHILD_SIZE_TOOLS = {"list_directory_with_sizes", "get_file_info"}
+# Tools that change specific paths named in their arguments
+WRITE_TOOLS = {"write_file", "edit_file", "create_directory", "move_file"}
+
+Snapshot = Optional[Tuple[int, int]]
+
+
+@dataclass
+class CacheStats:
+    """Per-session counters for the tool result cache."""
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class CacheEntry:
+    response: Dict[str, Any]
+    snapshots: Dict[str, Snapshot]
+    invocation_id: str
+    agent_name: str
+    turn: int
+    recursive: bool = False
+
+
+@dataclass
+class _SessionTurns:
+    invocation_id: Optional[str] = None
+    turn: int = 0
+    stats: CacheStats = field(default_factory=CacheStats)
+
+
+def _snapshot(path: str) -> Snapshot:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _snapshots(tool_name: str, paths: List[str]) -> Dict[str, Snapshot]:
+    """Snapshots of `paths`, plus the entries of directories for CHILD_SIZE_TOOLS."""
+    snapshots = {path: _snapshot(path) for path in paths}
+    if tool_name in CHILD_SIZE_TOOLS:
+        for path in paths:
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        snapshots[entry.path] = _snapshot(entry.path)
+            except OSError:
+                # Not a directory, or gone; its own snapshot covers it
+                continue
+    return snapshots
+
+
+def written_paths(tool_name: str, args: Dict[str, Any]) -> Optional[List[str]]:
+    """Paths a tool call may have changed, or None if it could have changed anything."""
+    if tool_name == "run_command":
+        return None
+    if tool_name == "apply_patch":
+        try:
+            return touched_paths(args.get("patch", ""))
+        except (PatchError, ValueError):
+            return None
+    if tool_name in WRITE_TOOLS:
+        try:
+            return paths_in_args(args)
+        except ValueError:
+            # The tool refuses paths outside the root, so nothing was written
+            return []
+    return []
+
+
+def is_error(response: Any) -> bool:
+    """Whether a tool result reports a failure."""
+    if getattr(response, "isError", False):
+        return True
+    return isinstance(response, dict) and (response.get("status") == "error" or "error" in response)
+
+
+class ToolResultCache:
+    """Memoizes read-only tool results for a window of turns.
+
+    Entries are keyed by session, tool name and normalized arguments. A hit
+    requires every path the call read to have the same mtime and size as
+    when it was cached, including the entries of a directory whose sizes
+    were listed, and recursive listings are only reused within the same
+    turn. Writes through Murlix's tools drop the affected entries, and
+    `run_command` drops everything since its effects are unknown. A repeat
+    of a call made earlier in the same turn returns a short note rather than
+    the whole result again, so the context doesn't grow.
+    """
+
+    def __init__(self, max_turns: Optional[int] = None, max_entries: int = 256):
+        if max_turns is None:
+            max_turns = int(os.environ.get("MURLIX_TOOL_CACHE_TURNS", 3))
+        self.max_turns = max_turns
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str], CacheEntry]" = OrderedDict()
+        self._sessions: Dict[str, _SessionTurns] = {}
+        self._served_calls: set = set()
+
+    @property
+    def stats(self) -> Dict[str, CacheStats]:
+        """Counters for each session that used the cache."""
+        return {session_id: turns.stats for session_id, turns in self._sessions.items()}
+
+    def _session(self, tool_context) -> Tuple[str, _SessionTurns]:
+        invocation_context = getattr(tool_context, "_invocation_context", None)
+        session = getattr(invocation_context, "session", None)
+        session_id = getattr(session, "id", "")
+        turns = self._sessions.setdefault(session_id, _SessionTurns())
+        if turns.invocation_id != tool_context.invocation_id:
+            turns.invocation_id = tool_context.invocation_id
+            turns.turn += 1
+        return session_id, turns
+
+    def _key(self, session_id: str, tool_name: str, args: Dict[str, Any]) -> Tuple[str, str, str]:
+        normalized = dict(args)
+        for name in PATH_ARGS:
+            value = normalized.get(name)
+            if isinstance(value, str):
+                normalized[name] = resolve_path(value)
+            elif isinstance(value, list):
+                normalized[name] = [resolve_path(v) if isinstance(v, str) else v for v in value]
+        return (session_id, tool_name, json.dumps(normalized, sort_keys=True, default=str))
+
+    def before_tool(self, tool, args, tool_context) -> Optional[dict]:
+        """before_tool_callback returning a cached result when it is still valid."""
+        if tool.name not in READ_ONLY_TOOLS or self.max_turns <= 0:
+            return None
+        session_id, turns = self._session(tool_context)
+        try:
+            key = self._key(session_id, tool.name, args)
+        except ValueError:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None and self._is_valid(entry, turns):
+            self._entries.move_to_end(key)
+            turns.stats.hits += 1
+            self._served_calls.add(tool_context.function_call_id)
+            # Parallel agents share an invocation but not each other's events
+            if (entry.invocation_id, entry.agent_name) == (tool_context.invocation_id, tool_context.agent_name):
+                return {"result": f"Unchanged since the identical {tool.name} call earlier in this turn; use that result."}
+            entry.invocation_id = tool_context.invocation_id
+            entry.agent_name = tool_context.agent_name
+            return entry.response
+
+        if entry is not None:
+            del self._entries[key]
+        turns.stats.misses += 1
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> None:
+        """after_tool_callback storing read results and invalidating written paths."""
+        if tool_context.function_call_id in self._served_calls:
+            self._served_calls.discard(tool_context.function_call_id)
+            return None
+        session_id, turns = self._session(tool_context)
+
+        if tool.name not in READ_ONLY_TOOLS:
+            written = written_paths(tool.name, args)
+            if written is None or written:
+                self._invalidate(turns, written)
+        elif tool.name in READ_ONLY_TOOLS and self.max_turns > 0 and not is_error(tool_response):
+            try:
+                key = self._key(session_id, tool.name, args)
+                paths = paths_in_args(args)
+            except ValueError:
+                return None
+            response = tool_response if isinstance(tool_response, dict) else {"result": tool_response}
+            self._entries[key] = CacheEntry(
+                response=response,
+                snapshots=_snapshots(tool.name, paths),
+                invocation_id=tool_context.invocation_id,
+                agent_name=tool_context.agent_name,
+                turn=turns.turn,
+                recursive=tool.name in RECURSIVE_TOOLS,
+            )
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return None
+
+    def _is_valid(self, entry: CacheEntry, turns: _SessionTurns) -> bool:
+        if entry.recursive and entry.invocation_id != turns.invocation_id:
+            return False
+        if turns.turn - entry.turn >= self.max_turns:
+            return False
+        return all(_snapshot(path) == snapshot for path, snapshot in entry.snapshots.items())
+
+    def _invalidate(self, turns: _SessionTurns, paths: Optional[List[str]]) -> None:
+        """Drop entries touching `paths`, or every entry if `paths` is None."""
+        if paths is None:
+            stale = list(self._entries)
+        else:
+            stale = [
+                key for key, entry in self._entries.items()
+                if not entry.snapshots or any(overlaps(p, w) for p in entry.snapshots for w in paths)
+            ]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            turns.stats.invalidations += len(stale)
+
+
+tool_cache = ToolResultCache()
@@ -0,0 +1,126 @@
+"""Windowed session loading and lazy paging of older session events."""
+
+import os
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import and_, or_
+
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.database_session_service import StorageEvent, StorageSession
+
+from .store import ensure_indexes
+
+
+DEFAULT_WINDOW = 50
+DEFAULT_PAGE_SIZE = 100
+
+
+class WindowedSessionService(DatabaseSessionService):
+    """Database session service with windowed resume and lazy event paging.
+
+    Resuming a session passes `resume_config()`, which loads the session
+    header, its state and only the last `window` events, so the first prompt
+    appears quickly however long the session is. This only shortens the path
+    to the first prompt: loads without a config, like the runner's at the
+    start of every turn, still return the full history the model needs.
+    Older events are read on demand with `iter_event_pages` and
+    `search_events`.
+    """
+
+    def __init__(self, db_url: str, window: Optional[int] = None):
+        super().__init__(db_url=db_url)
+        ensure_indexes(self.db_engine)
+        if window is None:
+            window = int(os.environ.get("MURLIX_SESSION_WINDOW", DEFAULT_WINDOW))
+        self.window = window
+
+    def resume_config(self) -> Optional[GetSessionConfig]:
+        """Config loading only the last `window` events, or None to load all."""
+        if self.window <= 0:
+            return None
+        return GetSessionConfig(num_recent_events=self.window)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        """List a project's sessions for a user, most recently updated first."""
+        with self.database_session_factory() as sql_session:
+            results = (
+                sql_session.query(StorageSession)
+                .filter(StorageSession.app_name == app_name)
+                .filter(StorageSession.user_id == user_id)
+                .order_by(StorageSession.update_time.desc())
+                .all()
+            )
+            return ListSessionsResponse(sessions=[s.to_session() for s in results])
+
+    async def iter_event_pages(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        before: Optional[Event] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> AsyncIterator[List[Event]]:
+        """Yield pages of events, newest page first, older than `before`.
+
+        Each page is in chronological order. Pagination is keyed on
+        (timestamp, id) so events sharing a timestamp are never skipped.
+        """
+        cursor = (datetime.fromtimestamp(before.timestamp), before.id) if before else None
+        while True:
+            with self.database_session_factory() as sql_session:
+                query = (
+                    sql_session.query(StorageEvent)
+                    .filter(StorageEvent.app_name == app_name)
+                    .filter(StorageEvent.user_id == user_id)
+                    .filter(StorageEvent.session_id == session_id)
+                )
+                if cursor:
+                    timestamp, event_id = cursor
+                    query = query.filter(or_(
+                        StorageEvent.timestamp < timestamp,
+                        and_(StorageEvent.timestamp == timestamp, StorageEvent.id < event_id),
+                    ))
+                storage_events = (
+                    query.order_by(StorageEvent.timestamp.desc(), StorageEvent.id.desc())
+                    .limit(page_size)
+                    .all()
+                )
+                if not storage_events:
+                    return
+                oldest = storage_events[-1]
+                cursor = (oldest.timestamp, oldest.id)
+                page = [e.to_event() for e in reversed(storage_events)]
+
+            yield page
+            if len(page) < page_size:
+                return
+
+    async def search_events(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        text: str,
+        limit: int = 20,
+    ) -> List[Event]:
+        """Find the most recent events whose text contains `text`."""
+        needle = text.lower()
+        matches: List[Event] = []
+        async for page in self.iter_event_pages(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        ):
+            for event in reversed(page):
+                if event.content and any(
+                    part.text and needle in part.text.lower()
+                    for part in event.content.parts or []
+                ):
+                    matches.append(event)
+                    if len(matches) >= limit:
+                        return matches
+        return matches
+
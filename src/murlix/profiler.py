@@ -0,0 +1,214 @@
+"""Low-overhead sampling profiler for the running Murlix process."""
+
+import os
+import sys
+import json
+import asyncio
+import threading
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+Stack = Tuple[str, ...]
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread from a background thread.
+
+    Samples are grouped per chat turn and labelled with the asyncio task and
+    the tools running at the time. Samples taken between turns, such as
+    startup or waiting for input, are kept apart under "between turns" so
+    they don't inflate any turn. Each finished turn is written as a
+    collapsed-stack file, and `stop` writes a speedscope file with one
+    profile per turn plus the time between turns.
+    """
+
+    def __init__(self, interval: Optional[float] = None, output_dir: Optional[str] = None):
+        if interval is None:
+            interval = float(os.environ.get("MURLIX_PROFILE_INTERVAL_MS", 10)) / 1000
+        self.interval = interval
+        self.output_dir = output_dir or os.environ.get(
+            "MURLIX_PROFILE_DIR", os.path.join(os.getcwd(), ".murlix", "profiles")
+        )
+        self.turn = 0
+        self.in_turn = False
+        # Keyed by turn number; None holds the samples taken between turns
+        self._turns: Dict[Optional[int], Counter] = {}
+        self._active_tools: Counter = Counter()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._prefix = ""
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start sampling in a background thread."""
+        if self.running:
+            return
+        self._prefix = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._turns = {}
+        self._attach_loop()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="murlix-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> List[str]:
+        """Stop sampling and write the remaining output. Returns written paths."""
+        if not self.running:
+            return []
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        paths = []
+        if self.in_turn:
+            path = self._write_collapsed(self.turn)
+            if path:
+                paths.append(path)
+        path = self._write_speedscope()
+        if path:
+            paths.append(path)
+        return paths
+
+    def begin_turn(self) -> None:
+        """Attribute the following samples to a new chat turn."""
+        self._attach_loop()
+        with self._lock:
+            self.turn += 1
+            self.in_turn = True
+            self._active_tools.clear()
+
+    def end_turn(self) -> Optional[str]:
+        """End the current turn and write its samples. Returns the path written."""
+        with self._lock:
+            # ADK skips after_tool_callback when a tool raises, so a failed
+            # call would otherwise label every later sample as that tool
+            self._active_tools.clear()
+            if not self.in_turn:
+                return None
+            self.in_turn = False
+        if self.running:
+            return self._write_collapsed(self.turn)
+        return None
+
+    def before_tool(self, tool, args, tool_context) -> None:
+        """before_tool_callback marking the start of a tool call."""
+        if self.running:
+            with self._lock:
+                self._active_tools[tool.name] += 1
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> None:
+        """after_tool_callback marking the end of a tool call."""
+        if self.running:
+            with self._lock:
+                self._active_tools[tool.name] -= 1
+                if self._active_tools[tool.name] <= 0:
+                    del self._active_tools[tool.name]
+
+    def _attach_loop(self) -> None:
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            threads = {t.ident: t for t in threading.enumerate()}
+            task = self._current_task_name()
+            with self._lock:
+                tools = sorted(self._active_tools)
+                turn = self.turn if self.in_turn else None
+                samples = self._turns.setdefault(turn, Counter())
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    thread = threads.get(thread_id)
+                    root = [f"turn {turn}" if turn is not None else "between turns", f"thread {thread.name if thread else thread_id}"]
+                    if thread is threading.main_thread() and task:
+                        root.append(f"task {task}")
+                    if tools:
+                        root.append(f"tool {'+'.join(tools)}")
+                    samples[tuple(root) + _frame_stack(frame)] += 1
+
+    def _current_task_name(self) -> Optional[str]:
+        if self._loop is None or self._loop.is_closed():
+            return None
+        # Reads the loop's current-task slot; safe enough under the GIL
+        task = asyncio.current_task(self._loop)
+        return task.get_name() if task else None
+
+    def _write_collapsed(self, turn: int) -> Optional[str]:
+        with self._lock:
+            samples = self._turns.get(turn)
+            if not samples:
+                return None
+            lines = [f"{';'.join(stack)} {count}" for stack, count in samples.items()]
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{self._prefix}-turn-{turn}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def _write_speedscope(self) -> Optional[str]:
+        frames: List[dict] = []
+        frame_index: Dict[str, int] = {}
+        profiles = []
+        weight = self.interval * 1000
+        with self._lock:
+            turns = sorted(
+                ((turn, samples) for turn, samples in self._turns.items() if samples),
+                key=lambda item: -1 if item[0] is None else item[0],
+            )
+            for turn, samples in turns:
+                stacks, weights = [], []
+                for stack, count in samples.items():
+                    indices = []
+                    for name in stack:
+                        if name not in frame_index:
+                            frame_index[name] = len(frames)
+                            frames.append({"name": name})
+                        indices.append(frame_index[name])
+                    stacks.append(indices)
+                    weights.append(count * weight)
+                profiles.append({
+                    "type": "sampled",
+                    "name": f"Turn {turn}" if turn is not None else "Between turns",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": stacks,
+                    "weights": weights,
+                })
+        if not profiles:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{self._prefix}.speedscope.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "shared": {"frames": frames},
+                "profiles": profiles,
+                "name": f"Murlix {self._prefix}",
+                "exporter": "murlix",
+            }, f)
+        return path
+
+
+def _frame_stack(frame) -> Stack:
+    """Root-first stack of a frame as `function (file:line)` names."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,218 @@
+"""Shared rate limiting and retry scheduling for model calls."""
+
+import os
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import contextvars
+
+from enum import IntEnum
+from typing import Any, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from google.genai.errors import APIError
+
+
+class Priority(IntEnum):
+    """Scheduling priority of a model call (lower is served first)."""
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+RETRYABLE_CODES = {429, 500, 503}
+
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "murlix_priority", default=Priority.INTERACTIVE
+)
+
+
+@dataclass
+class SchedulerStats:
+    """Counters describing how the scheduler treated model calls."""
+    requests: int = 0
+    throttled: int = 0
+    retried: int = 0
+    failed: int = 0
+    wait_seconds: float = 0.0
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at `per_minute` tokens per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds to wait until `amount` tokens are available."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Take `amount` tokens; a negative amount gives tokens back."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - min(amount, self.capacity))
+
+
+class ModelScheduler:
+    """Token-bucket limiter with priority queueing and retry backoff.
+
+    One instance is shared by every model call in the process, so bursts from
+    several sessions or batch work are smoothed before they reach the API.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 1_000_000,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = SchedulerStats()
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls) -> "ModelScheduler":
+        """Build a scheduler from MURLIX_* environment variables."""
+        return cls(
+            requests_per_minute=float(os.environ.get("MURLIX_RPM", 60)),
+            tokens_per_minute=float(os.environ.get("MURLIX_TPM", 1_000_000)),
+            max_retries=int(os.environ.get("MURLIX_MAX_RETRIES", 5)),
+        )
+
+    @contextmanager
+    def priority(self, priority: Priority):
+        """Run model calls made inside this block at the given priority."""
+        token = _current_priority.set(priority)
+        try:
+            yield
+        finally:
+            _current_priority.reset(token)
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Conditions bind to the running loop, and every CLI entry point
+        # starts a fresh one with asyncio.run().
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._waiters.clear()
+        return self._condition
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until a request of `tokens` estimated tokens may be sent."""
+        condition = self._get_condition()
+        ticket = (int(_current_priority.get()), next(self._sequence))
+        started = time.monotonic()
+        throttled = False
+
+        async with condition:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    delay = None
+                    if self._waiters[0] == ticket:
+                        delay = max(self.requests.delay_for(1), self.tokens.delay_for(tokens))
+                        if delay <= 0:
+                            break
+                    throttled = True
+                    try:
+                        await asyncio.wait_for(condition.wait(), delay)
+                    except TimeoutError:
+                        pass
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                condition.notify_all()
+
+        self.stats.requests += 1
+        if throttled:
+            self.stats.throttled += 1
+            self.stats.wait_seconds += time.monotonic() - started
+
+    def record_usage(self, estimated: int, actual: Optional[int]) -> None:
+        """Correct the token bucket once the real token count is known."""
+        if actual is not None:
+            self.tokens.consume(actual - estimated)
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        """Whether a failed call should be retried."""
+        return (
+            isinstance(error, APIError)
+            and error.code in RETRYABLE_CODES
+            and attempt < self.max_retries
+        )
+
+    def backoff(self, error: Exception, attempt: int) -> float:
+        """Delay before the next attempt, honoring any server retry hint."""
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return random.uniform(0, delay)  # Full jitter
+
+    async def wait_before_retry(self, error: Exception, attempt: int) -> None:
+        """Sleep for the backoff delay and count the retry."""
+        delay = self.backoff(error, attempt)
+        self.stats.retried += 1
+        self.stats.wait_seconds += delay
+        await asyncio.sleep(delay)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Extract a retry delay from a Retry-After header or RetryInfo detail."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+
+    details: Any = getattr(error, "details", None)
+    if isinstance(details, dict):
+        details = details.get("error", details)
+    if isinstance(details, dict):
+        details = details.get("details", [])
+    if isinstance(details, list):
+        for detail in details:
+            if isinstance(detail, dict) and "retryDelay" in detail:
+                try:
+                    return float(str(detail["retryDelay"]).rstrip("s"))
+                except ValueError:
+                    pass
+    return None
+
+
+def estimate_tokens(text_length: int) -> int:
+    """Rough token estimate from a character count."""
+    return max(1, text_length // 4)
+
+
+scheduler = ModelScheduler.from_env()
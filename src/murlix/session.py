@@ -1,4 +1,5 @@
 import os
+import time
 from typing import List, Optional, Tuple
 from datetime import datetime
 
@@ -8,21 +9,29 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.prompt import Prompt
 
-from google.adk.sessions import DatabaseSessionService, Session
+from google.adk.sessions import Session
 from google.adk.runners import Runner
 from google.genai.types import Content, Part
 
 from .core_agent.agent import root_agent, mcp_toolsets
+from .core_agent.repo_map import repo_map
+from .history import WindowedSessionService
+from .store import default_db_url, project_key
 
 class SessionManager:
     def __init__(self):
-        self.db_url = "sqlite:///./my_agent_data.db"
-        self.app_name = str(os.getcwd()).split(os.sep)[-1]  # Use os.sep for cross-platform compatibility
+        self.db_url = default_db_url()
+        self.app_name = project_key()
         self.user_id = os.environ.get("USER_ID", "default_user")
-        self.session_service = DatabaseSessionService(db_url=self.db_url)
+        self.session_service = WindowedSessionService(db_url=self.db_url)
+
+    def prepare_agent(self) -> None:
+        """Start refreshing the repository map; the agent gets it once ready."""
+        repo_map.start()
 
     async def create_session(self) -> Tuple[Runner, str]:
         """Create a new session."""
+        self.prepare_agent()
         session = await self.session_service.create_session(
             app_name=self.app_name,
             user_id=self.user_id
@@ -80,22 +89,27 @@ class SessionManager:
         if not sessions:
             return None
         
-        # Sort by created_at timestamp (most recent first)
-        # Handle cases where created_at might be None
-        sessions.sort(key=lambda s: getattr(s, 'created_at', 0) or 0, reverse=True)
+        # Sessions are listed most recently updated first
         return sessions[0]
     
     async def load_session(self, session_id: str) -> Optional[Runner]:
         """Load a specific session by ID."""
         try:
+            # Only the header, state and most recent events are loaded here, so
+            # the prompt appears quickly; the first turn loads the full history
+            started = time.perf_counter()
             session = await self.session_service.get_session(
                 app_name=self.app_name,
                 user_id=self.user_id,
-                session_id=session_id
+                session_id=session_id,
+                config=self.session_service.resume_config()
             )
+            elapsed_ms = (time.perf_counter() - started) * 1000
             if not session:
                 console.print(f"[red]Session not found:[/red] {session_id}")
                 return None
+
+            self.prepare_agent()
             
             runner = Runner(
                 agent=root_agent,
@@ -104,7 +118,8 @@ class SessionManager:
             )
             
             console.print(Panel(
-                f"📂 [green]Session loaded:[/green] [dim]{session_id}[/dim]",
+                f"📂 [green]Session loaded:[/green] [dim]{session_id}[/dim]\n"
+                f"[dim]{len(session.events)} recent events in {elapsed_ms:.0f} ms[/dim]",
                 border_style="green",
                 padding=(0, 2)
             ))
@@ -135,22 +150,19 @@ class SessionManager:
         table = Table(title="Available Sessions")
         table.add_column("Index", style="cyan", width=8)
         table.add_column("Session ID", style="green", width=20)
-        table.add_column("Created At", style="yellow", width=20)
+        table.add_column("Last Updated", style="yellow", width=20)
         table.add_column("Status", style="blue", width=12)
         
         for i, session in enumerate(sessions):
-            # Format the created_at timestamp safely
-            created_at = getattr(session, 'created_at', None)
-            if created_at:
+            # Format the last update timestamp safely
+            updated_at = getattr(session, 'last_update_time', None)
+            if updated_at:
                 try:
-                    if hasattr(created_at, 'strftime'):
-                        created_str = created_at.strftime("%Y-%m-%d %H:%M:%S")
-                    else:
-                        created_str = str(created_at)
-                except:
-                    created_str = "Unknown"
+                    updated_str = datetime.fromtimestamp(updated_at).strftime("%Y-%m-%d %H:%M:%S")
+                except (TypeError, ValueError, OSError):
+                    updated_str = str(updated_at)
             else:
-                created_str = "Unknown"
+                updated_str = "Unknown"
             
             # Get session status or ID as fallback info
             session_id = getattr(session, 'id', f'Session {i+1}')
@@ -158,7 +170,7 @@ class SessionManager:
             table.add_row(
                 str(i + 1),
                 session_id[:18] + "..." if len(session_id) > 20 else session_id,
-                created_str,
+                updated_str,
                 "Active"
             )
         
@@ -204,9 +216,6 @@ async def show_session_picker():
                 await runner.close()
         return
     
-    # Sort sessions by created_at (most recent first)
-    sessions.sort(key=lambda s: getattr(s, 'created_at', 0) or 0, reverse=True)
-    
     session_manager.display_sessions_table(sessions)
     
     try:
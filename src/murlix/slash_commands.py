@@ -1,7 +1,7 @@
 import sys
 import asyncio
 
-from typing import Dict, Callable, Optional, Any
+from typing import Dict, Callable, List, Optional, Any
 from dataclasses import dataclass
 
 from rich.panel import Panel
@@ -16,6 +16,7 @@ class SlashCommand:
     description: str
     handler: Callable
     usage: str = ""
+    takes_args: bool = False
 
 def handle_help() -> None:
     """Display help information for slash commands."""
@@ -60,11 +61,73 @@ def handle_new() -> None:
     """Handle the /new command to start a new session."""
     console.print("[yellow]To start a new session, please exit and run 'murlix' again.[/yellow]")
 
-def handle_slash_command(command: str) -> None:
+def handle_stats() -> None:
+    """Handle the /stats command to show model request and tool cache counters."""
+    from .scheduler import scheduler
+    from .core_agent.tool_cache import tool_cache
+    stats = scheduler.stats
+    stats_text = (
+        f"[cyan]Model requests:[/cyan] {stats.requests}\n"
+        f"[cyan]Throttled:[/cyan] {stats.throttled}\n"
+        f"[cyan]Retried:[/cyan] {stats.retried}\n"
+        f"[cyan]Failed:[/cyan] {stats.failed}\n"
+        f"[cyan]Time waiting:[/cyan] {stats.wait_seconds:.1f}s"
+    )
+    for session_id, cache_stats in tool_cache.stats.items():
+        stats_text += (
+            f"\n\n[cyan]Tool cache[/cyan] [dim]{session_id}[/dim]\n"
+            f"[cyan]Hits:[/cyan] {cache_stats.hits}  "
+            f"[cyan]Misses:[/cyan] {cache_stats.misses}  "
+            f"[cyan]Hit rate:[/cyan] {cache_stats.hit_rate:.0%}  "
+            f"[cyan]Invalidated:[/cyan] {cache_stats.invalidations}"
+        )
+    console.print(Panel(
+        stats_text,
+        title="Stats",
+        border_style="blue",
+        box=box.ROUNDED,
+        padding=(0, 2)
+    ))
+
+def handle_profile(args: List[str]) -> None:
+    """Handle the /profile command to start or stop the sampling profiler."""
+    from .profiler import profiler
+    action = args[0] if args else ""
+    if action == "start":
+        if profiler.running:
+            console.print("[yellow]Profiler is already running.[/yellow]")
+            return
+        profiler.start()
+        console.print(f"[green]Profiling started.[/green] [dim]Output: {profiler.output_dir}[/dim]")
+    elif action == "stop":
+        if not profiler.running:
+            console.print("[yellow]Profiler is not running.[/yellow]")
+            return
+        paths = profiler.stop()
+        console.print("[green]Profiling stopped.[/green]")
+        for path in paths:
+            console.print(f"[dim]  {path}[/dim]")
+    else:
+        console.print("[red]Usage:[/red] /profile start|stop")
+
+def handle_fanout(args: List[str]) -> None:
+    """Handle /fanout without a prompt; the chat loop runs it when one is given."""
+    console.print("[red]Usage:[/red] /fanout <task>")
+    console.print("[dim]Plans the task into independent subtasks and runs them in parallel.[/dim]")
+
+def handle_history(args: List[str]) -> None:
+    """Handle /history outside a chat session; the chat loop runs it in one."""
+    console.print("[yellow]/history is only available inside a chat session.[/yellow]")
+
+def handle_slash_command(user_input: str) -> None:
     """Handle a slash command."""
+    command, *args = user_input.split()
     if command in slash_commands:
         slash_command = slash_commands[command]
-        slash_command.handler()
+        if slash_command.takes_args:
+            slash_command.handler(args)
+        else:
+            slash_command.handler()
     else:
         available_commands = ", ".join(slash_commands.keys())
         console.print(f"[red]Unknown command:[/red] {command}")
@@ -102,5 +165,32 @@ slash_commands = {
         handler=handle_new,
         usage="/new"
     ),
+    "/stats": SlashCommand(
+        name="stats",
+        description="Show model request rate limiting and retry counters",
+        handler=handle_stats,
+        usage="/stats"
+    ),
+    "/profile": SlashCommand(
+        name="profile",
+        description="Start or stop the sampling profiler for this process",
+        handler=handle_profile,
+        usage="/profile start|stop",
+        takes_args=True
+    ),
+    "/history": SlashCommand(
+        name="history",
+        description="Scroll back through older messages, or search the session for text",
+        handler=handle_history,
+        usage="/history [text]",
+        takes_args=True
+    ),
+    "/fanout": SlashCommand(
+        name="fanout",
+        description="Split a wide task into subtasks and run them in parallel",
+        handler=handle_fanout,
+        usage="/fanout <task>",
+        takes_args=True
+    ),
 }
 
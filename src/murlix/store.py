@@ -0,0 +1,114 @@
+"""Location, project keys and indexes of the central session store."""
+
+import os
+import hashlib
+from typing import Dict, Optional
+
+from sqlalchemy import Index, MetaData, create_engine, select
+from sqlalchemy.engine import Engine
+
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions.database_session_service import StorageEvent, StorageSession
+
+# app_name is a VARCHAR(128) column in the session tables
+MAX_PROJECT_KEY_LENGTH = 128
+LEGACY_DB_FILENAME = "my_agent_data.db"
+MIGRATED_TABLES = ("sessions", "events", "app_states", "user_states")
+
+INDEXES = [
+    # Per-project session listing, newest first
+    Index(
+        "ix_sessions_project_user_updated",
+        StorageSession.app_name,
+        StorageSession.user_id,
+        StorageSession.update_time,
+    ),
+    # Windowed loads and backwards paging of a session's events
+    Index(
+        "ix_events_session_timestamp",
+        StorageEvent.app_name,
+        StorageEvent.user_id,
+        StorageEvent.session_id,
+        StorageEvent.timestamp,
+    ),
+]
+
+
+def data_dir() -> str:
+    """Murlix's data directory, following the XDG base directory spec."""
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "murlix")
+
+
+def default_db_url() -> str:
+    """MURLIX_DB_URL, or a single SQLite database in the data directory."""
+    db_url = os.environ.get("MURLIX_DB_URL")
+    if db_url:
+        return db_url
+    os.makedirs(data_dir(), exist_ok=True)
+    return f"sqlite:///{os.path.join(data_dir(), 'sessions.db')}"
+
+
+def project_key(path: Optional[str] = None) -> str:
+    """Key sessions by the canonical project path, so same-named directories don't collide."""
+    key = os.path.realpath(path or os.getcwd())
+    if len(key) > MAX_PROJECT_KEY_LENGTH:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        key = f"{os.path.basename(key)[:MAX_PROJECT_KEY_LENGTH - 17]}-{digest}"
+    return key
+
+
+def ensure_indexes(engine: Engine) -> None:
+    """Create the store's indexes if they don't exist yet."""
+    for index in INDEXES:
+        index.create(engine, checkfirst=True)
+
+
+def migrate_database(source_url: str, project: str, target_url: Optional[str] = None) -> Dict[str, int]:
+    """Copy a per-directory session database into the central store.
+
+    Every row is re-keyed to `project`'s project key. Rows already present
+    in the target are skipped, so running the migration twice is harmless.
+    The source database is left untouched. Returns rows copied per table.
+    """
+    target_service = DatabaseSessionService(db_url=target_url or default_db_url())
+    target_engine = target_service.db_engine
+    ensure_indexes(target_engine)
+
+    source_engine = create_engine(source_url)
+    source_metadata = MetaData()
+    source_metadata.reflect(source_engine, only=lambda name, _: name in MIGRATED_TABLES)
+    target_metadata = MetaData()
+    target_metadata.reflect(target_engine, only=MIGRATED_TABLES)
+
+    app_name = project_key(project)
+    copied = {}
+    with source_engine.connect() as source, target_engine.begin() as target:
+        for name in MIGRATED_TABLES:
+            if name not in source_metadata.tables:
+                continue
+            source_table = source_metadata.tables[name]
+            target_table = target_metadata.tables[name]
+            columns = [c.name for c in target_table.columns if c.name in source_table.columns]
+            key_columns = [c.name for c in target_table.primary_key.columns]
+
+            existing = {
+                tuple(row)
+                for row in target.execute(
+                    select(*(target_table.c[k] for k in key_columns))
+                    .where(target_table.c.app_name == app_name)
+                )
+            }
+            rows = []
+            for row in source.execute(select(*(source_table.c[c] for c in columns))):
+                values = dict(row._mapping)
+                values["app_name"] = app_name
+                key = tuple(values[k] for k in key_columns)
+                if key not in existing:
+                    existing.add(key)
+                    rows.append(values)
+            if rows:
+                target.execute(target_table.insert(), rows)
+            copied[name] = len(rows)
+    source_engine.dispose()
+    return copied
@@ -5,6 +5,7 @@ from rich.text import Text
 from rich.align import Align
 from rich import box
 from rich.markdown import Markdown
+from rich.markup import escape
 
 from .utils.console import console
 
@@ -75,6 +76,36 @@ def display_welcome():
     console.print(continue_panel)
 
 
+MAX_ARG_CHARS = 200
+
+
+def format_tool_args(args) -> str:
+    """Summarize tool call arguments so large patches or file contents stay on one line."""
+    if not args:
+        return ""
+    parts = []
+    for name, value in args.items():
+        text = value if isinstance(value, str) else repr(value)
+        if len(text) > MAX_ARG_CHARS or "\n" in text:
+            lines = text.count("\n") + 1
+            first_line = text.split("\n", 1)[0][:60]
+            text = f"{first_line!r}… ({lines} lines, {len(text)} chars)"
+        elif isinstance(value, str):
+            text = repr(value)
+        parts.append(f"{name}={text}")
+    return ", ".join(parts)
+
+
+def is_tool_error(response) -> bool:
+    """Whether a function response reports a failure, for MCP and native tools."""
+    if not isinstance(response, dict):
+        return False
+    result = response.get("result")
+    if getattr(result, "isError", False):
+        return True
+    return response.get("status") == "error" or "error" in response
+
+
 def show_agent_response(event):
     """Display agent responses with beautiful formatting"""
     
@@ -83,7 +114,7 @@ def show_agent_response(event):
             if hasattr(part, 'function_call') and part.function_call:
                 # Show tool calls with nice formatting
                 tool_panel = Panel(
-                    f"[cyan]{part.function_call.name}[/cyan]([dim]{part.function_call.args}[/dim])",
+                    f"[cyan]{part.function_call.name}[/cyan]([dim]{escape(format_tool_args(part.function_call.args))}[/dim])",
                     title="Tool Call",
                     title_align="left",
                     border_style="yellow",
@@ -94,7 +125,7 @@ def show_agent_response(event):
                 console.print()
 
             elif hasattr(part, 'function_response') and part.function_response:
-                if part.function_response.response['result'].isError:
+                if is_tool_error(part.function_response.response):
                     error_panel = Panel(
                         f"❌ [red]Error in tool call[/red]",
                         border_style="red",
@@ -135,6 +166,61 @@ def show_agent_response(event):
             console.print(response_panel)
 
 
+def show_fanout_event(event):
+    """Display a fan-out worker's tool calls as compact one-line progress."""
+    if not (event.content and event.content.parts):
+        return
+    for part in event.content.parts:
+        if part.function_call:
+            console.print(
+                f"[dim]{event.author}[/dim] [cyan]{part.function_call.name}[/cyan]"
+                f"([dim]{escape(format_tool_args(part.function_call.args))}[/dim])"
+            )
+        elif part.function_response and is_tool_error(part.function_response.response):
+            console.print(f"[dim]{event.author}[/dim] [red]❌ {part.function_response.name} failed[/red]")
+
+
+def show_fanout_report(report: str):
+    """Display the merged report of a fan-out run."""
+    console.print(Panel(
+        Markdown(report),
+        title="Fan-out",
+        title_align="left",
+        border_style="bright_green",
+        box=box.ROUNDED,
+        padding=(0, 2)
+    ))
+
+
+HISTORY_PREVIEW_CHARS = 300
+
+
+def show_history_events(events, title: str):
+    """Display the text messages among older session events, oldest first."""
+    lines = []
+    tool_events = 0
+    for event in events:
+        text = "".join(part.text for part in (event.content.parts or []) if part.text) if event.content else ""
+        if not text.strip():
+            tool_events += 1
+            continue
+        speaker = "[cyan]You[/cyan]" if event.author == "user" else "[green]Murlix[/green]"
+        text = text.strip()
+        if len(text) > HISTORY_PREVIEW_CHARS:
+            text = text[:HISTORY_PREVIEW_CHARS] + "…"
+        lines.append(f"{speaker}: {escape(text)}")
+    if tool_events:
+        lines.append(f"[dim]({tool_events} tool events not shown)[/dim]")
+    console.print(Panel(
+        "\n\n".join(lines) or "[dim]No messages found.[/dim]",
+        title=title,
+        title_align="left",
+        border_style="blue",
+        box=box.ROUNDED,
+        padding=(0, 2)
+    ))
+
+
 def show_ready_message():
     """Display the ready message when chat starts."""
     ready_panel = Panel(
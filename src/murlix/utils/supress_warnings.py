@@ -14,6 +14,9 @@ class _NoFunctionCallWarning(logging.Filter):
             return False
         if "Using FunctionTool instead" in message:
             return False
+        # Filter out tracing noise from parallel fan-out agents
+        if "Failed to detach context" in message:
+            return False
         return True
 
 # Suppress experimental feature warnings
@@ -24,5 +27,5 @@ logging.getLogger("google_adk.google.adk.tools.base_authenticated_tool").disable
 
 # Apply filter to key loggers
 filter_instance = _NoFunctionCallWarning()
-for logger_name in ["google_genai.types", "google.adk", "mcp", ""]:
+for logger_name in ["google_genai.types", "google.adk", "mcp", "", "opentelemetry.context"]:
     logging.getLogger(logger_name).addFilter(filter_instance)
\ No newline at end of file